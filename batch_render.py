@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Elite Systems AI - Headless Batch Carousel Renderer
+Renders carousel specs (theme + AI suggestion structure) from a directory or JSONL file
+without Streamlit, using a worker pool
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from carousel_engine import (BrandTheme, CarouselGenerator, post_copy_files, render_cache, slide_fingerprint,
+                             slides_from_suggestions)
+
+# Matches the sidebar's default Typography sliders
+DEFAULT_FONT_SIZES = {'title': 68, 'subtitle': 48, 'body': 36, 'bullet': 32}
+
+REQUIRED_SPEC_FIELDS = ['hook_slide', 'content_slides', 'cta_slide']
+
+
+def load_specs(source: Path) -> List[Tuple[str, Dict]]:
+    """Read (name, spec) pairs from a directory of *.json files or a single JSONL file"""
+    specs = []
+
+    if source.is_dir():
+        for spec_path in sorted(source.glob("*.json")):
+            with open(spec_path, "r") as f:
+                spec = json.load(f)
+            specs.append((spec.get("name") or spec_path.stem, spec))
+    else:
+        with open(source, "r") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                spec = json.loads(line)
+                specs.append((spec.get("name") or f"{source.stem}_{line_number:04d}", spec))
+
+    return specs
+
+
+def render_spec(name: str, spec: Dict, plan_only: bool = False, use_cache: bool = True) -> Dict:
+    """Render one carousel spec to encoded files - runs inside a worker process"""
+    start_time = time.perf_counter()
+
+    missing = [field for field in REQUIRED_SPEC_FIELDS if field not in spec]
+    if missing:
+        raise ValueError(f"spec is missing {', '.join(missing)}")
+
+    theme = BrandTheme(**{"name": name, **spec.get("theme", {})})
+    slides = slides_from_suggestions(spec)
+    generator = CarouselGenerator(theme)
+    custom_sizes = spec.get("custom_sizes") or DEFAULT_FONT_SIZES
+
+    # Layout plans alone are enough to catch slides whose text does not fit
+    plans = generator.plan_carousel(slides, custom_sizes)
+    overflow = [plan.slide_number for plan in plans if plan.overflow]
+    if plan_only:
+        layout = json.dumps([plan.to_dict() for plan in plans], indent=2)
+        return {
+            "name": name,
+            "files": [("layout.json", layout.encode("utf-8"))],
+            "slides": len(plans),
+            "overflow": overflow,
+            "render_seconds": time.perf_counter() - start_time,
+            "total_seconds": time.perf_counter() - start_time
+        }
+
+    # Slides any worker or app session rendered before come from the shared render cache - the
+    # module-level one, so each worker process measures the cache directory once, not per spec
+    cache = render_cache if use_cache else None
+    keys = [slide_fingerprint(theme, slide, custom_sizes) for slide in slides]
+    encoded = [cache.get(key) if cache else None for key in keys]
+
+    # The pool already runs one carousel per core, so render each carousel's slides in order
+    images = {index: generator.create_slide(slide, custom_sizes)
+              for index, slide in enumerate(slides) if encoded[index] is None}
+    render_time = time.perf_counter() - start_time
+
+    for index, img in images.items():
+        encoded[index] = generator.encode_slide(img, "PNG")
+        if cache and slides[index].slide_number not in generator.failed_slides:
+            cache.put(keys[index], encoded[index])
+
+    files = [(f"slide_{slide_number:02d}.png", data) for slide_number, data in enumerate(encoded, start=1)]
+
+    files.extend(post_copy_files(spec))
+
+    return {
+        "name": name,
+        "files": files,
+        "slides": len(slides),
+        "overflow": overflow,
+        "cached": len(slides) - len(images),
+        "stages": stage_totals(generator.stage_timings),
+        "render_seconds": render_time,
+        "total_seconds": time.perf_counter() - start_time
+    }
+
+
+def stage_totals(stage_timings: List[Dict]) -> Dict[str, float]:
+    """Sum per-slide stage timings (ms) into one total per stage"""
+    totals = {}
+    for timings in stage_timings:
+        for stage, ms in timings.items():
+            if stage != 'slide_number':
+                totals[stage] = totals.get(stage, 0.0) + ms
+    return totals
+
+
+def write_result(result: Dict, output_dir: Path = None, archive: zipfile.ZipFile = None):
+    """Write a rendered carousel into its own folder or into the shared archive"""
+    for filename, data in result["files"]:
+        if archive is not None:
+            # PNGs are already compressed - store them as-is
+            compress = zipfile.ZIP_STORED if filename.endswith(".png") else zipfile.ZIP_DEFLATED
+            archive.writestr(f"{result['name']}/{filename}", data, compress_type=compress)
+        else:
+            carousel_dir = output_dir / result["name"]
+            carousel_dir.mkdir(parents=True, exist_ok=True)
+            (carousel_dir / filename).write_bytes(data)
+
+
+def main(argv: List[str] = None) -> bool:
+    """Render every spec and print per-carousel timing and overall throughput"""
+    parser = argparse.ArgumentParser(description="Render Instagram carousels from JSON specs without Streamlit")
+    parser.add_argument("source", type=Path, help="Directory of *.json specs or a .jsonl file")
+    destination = parser.add_mutually_exclusive_group()
+    destination.add_argument("--output", type=Path, default=Path("carousel_output"),
+                             help="Directory for rendered carousels (default: carousel_output)")
+    destination.add_argument("--archive", type=Path, help="Write everything into a single .zip archive instead")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: one per CPU core)")
+    parser.add_argument("--plan-only", action="store_true",
+                        help="Write each carousel's layout plan (layout.json) without rasterizing any slides")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Render every slide instead of reusing renders from the shared render cache")
+    parser.add_argument("--verbose", action="store_true", help="Show per-slide rendering logs")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    if not args.source.exists():
+        print(f"❌ No such file or directory: {args.source}")
+        return False
+
+    specs = load_specs(args.source)
+    if not specs:
+        print(f"❌ No carousel specs found in {args.source}")
+        return False
+
+    print(f"🚀 Rendering {len(specs)} carousels with {args.workers} workers")
+    batch_start = time.perf_counter()
+    total_slides = 0
+    cached_slides = 0
+    failures = 0
+    stages = {}
+
+    archive = zipfile.ZipFile(args.archive, "w") if args.archive else None
+    try:
+        with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            futures = {pool.submit(render_spec, name, spec, args.plan_only, not args.no_cache): name
+                       for name, spec in specs}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failures += 1
+                    print(f"❌ {name}: {e}")
+                    continue
+
+                write_result(result, output_dir=args.output, archive=archive)
+                total_slides += result["slides"]
+                cached_slides += result.get("cached", 0)
+                for stage, ms in result.get("stages", {}).items():
+                    stages[stage] = stages.get(stage, 0.0) + ms
+                print(f"✅ {name}: {result['slides']} slides in {result['total_seconds']:.2f}s "
+                      f"(render {result['render_seconds']:.2f}s, "
+                      f"{result['slides'] / result['total_seconds']:.1f} slides/s)")
+                if result["overflow"]:
+                    print(f"⚠️  {name}: text overflows on slides {', '.join(map(str, result['overflow']))}")
+    finally:
+        if archive is not None:
+            archive.close()
+
+    elapsed = time.perf_counter() - batch_start
+    rendered = len(specs) - failures
+    print("=" * 50)
+    print(f"Rendered {rendered}/{len(specs)} carousels ({total_slides} slides) in {elapsed:.2f}s")
+    print(f"Throughput: {rendered / elapsed:.2f} carousels/s, {total_slides / elapsed:.1f} slides/s")
+    print(f"Output: {args.archive or args.output}")
+    if cached_slides:
+        print(f"Render cache: {cached_slides}/{total_slides} slides reused")
+
+    if stages:
+        # Summed across workers, so the shares show where CPU time goes rather than wall time
+        stage_total = sum(stages.values())
+        print("Stage breakdown: " + ", ".join(
+            f"{stage} {ms / total_slides:.1f} ms/slide ({ms / stage_total:.0%})"
+            for stage, ms in sorted(stages.items(), key=lambda item: item[1], reverse=True)
+        ))
+
+    return failures == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,742 @@
+#!/usr/bin/env python3
+"""
+Elite Systems AI - Carousel Rendering Benchmarks
+Times the CarouselGenerator hot paths against the implementations they replaced
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+import PIL
+from PIL import Image, ImageChops, ImageDraw, ImageOps, ImageStat
+
+import carousel_engine as engine
+
+# Per-slide INFO logs would drown out the results
+logging.disable(logging.INFO)
+
+
+CUSTOM_SIZES = {'title': 68, 'subtitle': 48, 'body': 36, 'bullet': 32}
+
+FIXTURES = {
+    "cover": engine.CarouselSlide(
+        slide_number=1,
+        title="5 Automation Wins Every Agency Needs",
+        subtitle="Swipe to learn more →",
+        background_style="gradient",
+        slide_type="cover"
+    ),
+    "content": engine.CarouselSlide(
+        slide_number=2,
+        title="Automate Your Follow-Ups",
+        subtitle="Stop losing leads in your inbox",
+        bullet_points=[
+            "Trigger emails from form fills",
+            "Score leads before sales calls",
+            "Sync every reply to your CRM"
+        ],
+        background_style="gradient"
+    ),
+    "cta": engine.CarouselSlide(
+        slide_number=5,
+        title="Want more tips?",
+        subtitle="Follow for daily insights",
+        body_text="Drop a comment if this helped!",
+        background_style="solid",
+        slide_type="cta"
+    ),
+}
+
+
+# Representative slides for the create_slide suite - gradient vs solid is content_6_bullets vs content_solid
+SUITE_FIXTURES = {
+    "cover_handle_badge": FIXTURES["cover"],
+    "content_6_bullets": engine.CarouselSlide(
+        slide_number=2,
+        title="Automate Your Follow-Ups",
+        subtitle="Stop losing leads in your inbox",
+        bullet_points=[
+            "Trigger emails from form fills",
+            "Score leads before sales calls",
+            "Sync every reply to your CRM",
+            "Book meetings without back-and-forth",
+            "Send proposals the moment a call ends",
+            "Chase unpaid invoices automatically"
+        ],
+        background_style="gradient"
+    ),
+    "long_text": engine.CarouselSlide(
+        slide_number=3,
+        title="Why Most Agencies Plateau at Ten Clients and What the Top One Percent Do Differently",
+        subtitle="The operational bottlenecks nobody talks about when you start scaling past your first hires",
+        body_text=("Growth stalls when every project depends on the founder. Documented processes, automated "
+                   "handoffs and dashboards that surface problems early let a small team deliver like a "
+                   "large one without burning out."),
+        bullet_points=[
+            "Write down every recurring task before you hire for it",
+            "Automate client onboarding from contract to kickoff call",
+            "Review delivery metrics weekly instead of at quarter end",
+            "Price on outcomes so growth does not mean more hours"
+        ],
+        background_style="gradient"
+    ),
+    "content_solid": engine.CarouselSlide(
+        slide_number=4,
+        title="Automate Your Follow-Ups",
+        subtitle="Stop losing leads in your inbox",
+        bullet_points=[
+            "Trigger emails from form fills",
+            "Score leads before sales calls",
+            "Sync every reply to your CRM",
+            "Book meetings without back-and-forth",
+            "Send proposals the moment a call ends",
+            "Chase unpaid invoices automatically"
+        ],
+        background_style="solid"
+    ),
+    "mixed_symbols": engine.CarouselSlide(
+        slide_number=5,
+        title="Ready to Scale? 🚀 Let’s Go →",
+        subtitle="Systems that run while you sleep ☾ ✓",
+        bullet_points=[
+            "★ Trigger emails from form fills ✉",
+            "⚡ Score leads before sales calls",
+            "✔ Sync every reply to your CRM 💙",
+            "→ Book meetings in München, São Paulo and 東京"
+        ],
+        background_style="gradient"
+    ),
+}
+
+# custom_sizes as sent by the sidebar sliders vs the generator's adaptive font sizing
+SUITE_SIZINGS = {"custom": CUSTOM_SIZES, "adaptive": None}
+
+
+def benchmark_theme() -> "engine.BrandTheme":
+    """Theme shared by every benchmark so results stay comparable"""
+    return engine.BrandTheme(
+        name="Benchmark",
+        primary_color="#2563eb",
+        secondary_color="#3b82f6",
+        accent_color="#ff3b3b",
+        brand_handle="elite.systemsai",
+        show_verified_badge=True
+    )
+
+
+def reset_render_caches():
+    """Drop the per-slide caches so every render does the full amount of work"""
+    engine.CarouselGenerator._layout_cache.clear()
+    cache = engine.CarouselGenerator._text_block_cache
+    with cache._lock:
+        cache._blocks.clear()
+        cache.bytes_used = 0
+    with engine.font_fallback._lock:
+        engine.font_fallback._runs.clear()
+
+
+def carousel_fixture(slide_count: int):
+    """A carousel of distinct slides: cover, content slides and a CTA"""
+    slides = [FIXTURES["cover"]]
+    for number in range(2, slide_count):
+        content = FIXTURES["content"]
+        slides.append(engine.CarouselSlide(
+            slide_number=number,
+            title=f"{content.title} #{number}",
+            subtitle=content.subtitle,
+            bullet_points=[f"{bullet} ({number})" for bullet in content.bullet_points],
+            background_style=content.background_style
+        ))
+    cta = FIXTURES["cta"]
+    slides.append(engine.CarouselSlide(
+        slide_number=slide_count,
+        title=cta.title,
+        subtitle=cta.subtitle,
+        body_text=cta.body_text,
+        background_style=cta.background_style,
+        slide_type="cta"
+    ))
+    return slides
+
+
+def time_call(func, repeat: int = 5) -> float:
+    """Return the best wall time of `repeat` calls in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def legacy_apply_gradient(img: Image.Image, color1: str, color2: str):
+    """The original per-row gradient loop, kept as the benchmark baseline"""
+    width, height = img.size
+    c1 = tuple(int(color1.lstrip('#')[i:i+2], 16) for i in (0, 2, 4))
+    c2 = tuple(int(color2.lstrip('#')[i:i+2], 16) for i in (0, 2, 4))
+
+    for y in range(height):
+        ratio = y / height
+        r = int(c1[0] * (1 - ratio) + c2[0] * ratio)
+        g = int(c1[1] * (1 - ratio) + c2[1] * ratio)
+        b = int(c1[2] * (1 - ratio) + c2[2] * ratio)
+
+        draw = ImageDraw.Draw(img)
+        draw.rectangle([(0, y), (width, y+1)], fill=(r, g, b))
+
+
+class DirectDrawGenerator(engine.CarouselGenerator):
+    """CarouselGenerator that draws text straight onto the slide, bypassing the text block cache"""
+
+    def _paste_text_block(self, img, text, position, font, align="left",
+                          max_width=900, add_shadow=False, lines=None):
+        return self._draw_text_with_effects(ImageDraw.Draw(img), text, position, font, "#ffffff",
+                                            align, max_width, add_shadow)
+
+
+class LegacyOutlineGenerator(DirectDrawGenerator):
+    """CarouselGenerator with the original offset-grid outline loop, kept as the benchmark baseline"""
+
+    def _draw_text_with_effects(self, draw, text, position, font, color, align="left",
+                                max_width=900, add_shadow=False):
+        lines = self._wrap_text(text, draw, font, max_width)
+        if not lines:
+            return 0
+
+        sample_bbox = draw.textbbox((0, 0), "Ay", font=font)
+        line_height = sample_bbox[3] - sample_bbox[1]
+        line_spacing = int(line_height * 0.2)
+        y = position[1]
+
+        for line in lines:
+            bbox = draw.textbbox((0, 0), line, font=font)
+            line_width = bbox[2] - bbox[0]
+            if align == "center":
+                x = position[0] - line_width // 2
+            elif align == "right":
+                x = position[0] - line_width
+            else:
+                x = position[0]
+
+            outline_thickness = 4 if font.size > 50 else 3
+            for dx in range(-outline_thickness, outline_thickness + 1):
+                for dy in range(-outline_thickness, outline_thickness + 1):
+                    if dx != 0 or dy != 0:
+                        draw.text((x + dx, y + dy), line, fill="#000000", font=font)
+
+            if add_shadow:
+                draw.text((x + 6, y + 6), line, fill="#000000", font=font)
+
+            draw.text((x, y), line, fill="#ffffff", font=font)
+            y += line_height + line_spacing
+
+        return len(lines) * line_height + (len(lines) - 1) * line_spacing
+
+
+def legacy_wrap_text(text: str, draw, font, max_width: int):
+    """The original prefix-measuring line breaker, kept as the benchmark baseline"""
+    words = text.split()
+    lines = []
+    current_line = []
+
+    for word in words:
+        test_line = ' '.join(current_line + [word])
+        bbox = draw.textbbox((0, 0), test_line, font=font)
+        if bbox[2] - bbox[0] <= max_width:
+            current_line.append(word)
+        else:
+            if current_line:
+                lines.append(' '.join(current_line))
+                current_line = [word]
+            else:
+                lines.append(word)
+
+    if current_line:
+        lines.append(' '.join(current_line))
+
+    return lines
+
+
+def benchmark_gradient():
+    """Compare the cached gradient engine with the per-row loop"""
+    print("🌈 Gradient background (1080x1080)")
+    theme = benchmark_theme()
+    generator = engine.CarouselGenerator(theme)
+    size = generator.INSTAGRAM_SIZE
+    colors = (theme.primary_color, theme.secondary_color)
+
+    legacy_ms = time_call(lambda: legacy_apply_gradient(Image.new('RGB', size), *colors))
+    print(f"   per-row loop:            {legacy_ms:8.2f} ms")
+    results = {'legacy_ms': legacy_ms, 'cold_ms': {}}
+
+    for direction in engine.GRADIENT_DIRECTIONS:
+        def build():
+            engine.render_gradient(colors + (theme.accent_color,), direction, size)
+        cold_ms = time_call(build)
+        results['cold_ms'][direction] = cold_ms
+        print(f"   engine {direction:<10} cold: {cold_ms:8.2f} ms  ({legacy_ms / cold_ms:5.1f}x)")
+
+    engine.render_memo.clear('backgrounds')
+    cached_ms = time_call(lambda: generator._apply_gradient(Image.new('RGB', size), *colors), repeat=20)
+    print(f"   engine cached paste:     {cached_ms:8.2f} ms  ({legacy_ms / cached_ms:5.1f}x)")
+    print(f"   memo: {engine.render_memo.stats()['namespaces']['backgrounds']}")
+    results['cached_paste_ms'] = cached_ms
+    return results
+
+
+def benchmark_outline():
+    """Compare the single-pass stroked outline with the offset-grid loop"""
+    print("✏️  Text outline (create_slide per fixture)")
+    theme = benchmark_theme()
+    legacy = LegacyOutlineGenerator(theme)
+    current = DirectDrawGenerator(theme)
+    results = {}
+
+    for name, slide in FIXTURES.items():
+        legacy_ms = time_call(lambda: legacy.create_slide(slide, CUSTOM_SIZES))
+        current_ms = time_call(lambda: current.create_slide(slide, CUSTOM_SIZES))
+
+        # Mean per-channel difference (0-255) shows how close the output looks
+        diff = ImageChops.difference(legacy.create_slide(slide, CUSTOM_SIZES),
+                                     current.create_slide(slide, CUSTOM_SIZES))
+        mean_diff = sum(ImageStat.Stat(diff).mean) / 3
+        print(f"   {name:<8} loop {legacy_ms:8.2f} ms | stroke {current_ms:8.2f} ms | "
+              f"{legacy_ms / current_ms:5.1f}x | mean pixel diff {mean_diff:.2f}")
+        results[name] = {'loop_ms': legacy_ms, 'stroke_ms': current_ms, 'mean_pixel_diff': mean_diff}
+
+    return results
+
+
+def benchmark_wrap():
+    """Compare cached-advance line breaking with prefix re-measuring"""
+    print("📏 Text wrapping (_wrap_text)")
+    generator = engine.CarouselGenerator(benchmark_theme())
+    fonts = generator._load_fonts_with_emoji_support(CUSTOM_SIZES)
+    draw = ImageDraw.Draw(Image.new('RGB', generator.INSTAGRAM_SIZE))
+    words = ("Automation turns every repetitive agency task into a reliable system "
+             "that runs while you sleep and scales with your client list").split()
+    results = {}
+
+    for word_count in (10, 40, 160):
+        text = ' '.join((words * (word_count // len(words) + 1))[:word_count])
+        font = fonts['body']
+        legacy_ms = time_call(lambda: legacy_wrap_text(text, draw, font, generator.SAFE_ZONE))
+        cold_ms = time_call(lambda: (generator._text_metrics._advances.clear(),
+                                     generator._wrap_text(text, draw, font, generator.SAFE_ZONE)))
+        warm_ms = time_call(lambda: generator._wrap_text(text, draw, font, generator.SAFE_ZONE), repeat=20)
+        print(f"   {word_count:>3} words  prefix {legacy_ms:8.2f} ms | cold {cold_ms:6.2f} ms | "
+              f"warm {warm_ms:6.3f} ms | {legacy_ms / warm_ms:6.1f}x")
+        results[f"{word_count}_words"] = {'prefix_ms': legacy_ms, 'cold_ms': cold_ms, 'warm_ms': warm_ms}
+
+    metrics = generator._text_metrics
+    print(f"   advance cache: {metrics.hits} hits, {metrics.misses} misses")
+    return results
+
+
+def benchmark_text_blocks():
+    """Compare create_slide with a cold and a warm text block cache"""
+    print("🧱 Text block raster cache (create_slide per fixture)")
+    generator = engine.CarouselGenerator(benchmark_theme())
+    cache = generator._text_block_cache
+    results = {}
+
+    for name, slide in FIXTURES.items():
+        def cold():
+            cache._blocks.clear()
+            cache.bytes_used = 0
+            generator.create_slide(slide, CUSTOM_SIZES)
+        cold_ms = time_call(cold)
+        warm_ms = time_call(lambda: generator.create_slide(slide, CUSTOM_SIZES), repeat=20)
+        print(f"   {name:<8} cold {cold_ms:7.2f} ms | warm {warm_ms:6.2f} ms | {cold_ms / warm_ms:5.1f}x")
+        results[name] = {'cold_ms': cold_ms, 'warm_ms': warm_ms}
+
+    stats = cache.stats()
+    print(f"   cache: {stats['blocks']} blocks, {stats['bytes_used'] / 1024:.0f} KB, "
+          f"{stats['hit_rate']:.0%} hit rate")
+    return results
+
+
+def benchmark_parallel():
+    """Show how render_carousel scales with worker count for 5, 10 and 20 slides"""
+    cores = os.cpu_count() or 1
+    print(f"🧵 Parallel render_carousel ({cores} cores available, cold caches)")
+    generator = engine.CarouselGenerator(benchmark_theme())
+    worker_counts = sorted({1, 2, 4, cores})
+    results = {'cores': cores}
+
+    for slide_count in (5, 10, 20):
+        slides = carousel_fixture(slide_count)
+        timings = {}
+        for workers in worker_counts:
+            def render():
+                reset_render_caches()
+                generator.render_carousel(slides, CUSTOM_SIZES, workers=workers)
+            timings[workers] = time_call(render, repeat=3)
+
+        row = " | ".join(f"{workers}w {ms:7.1f} ms ({timings[1] / ms:4.1f}x)" for workers, ms in timings.items())
+        print(f"   {slide_count:>2} slides  {row}")
+        results[f"{slide_count}_slides"] = {f"{workers}_workers_ms": ms for workers, ms in timings.items()}
+
+    return results
+
+
+def benchmark_draft():
+    """Compare a cold 5-slide preview (render + PNG encode) at full size and at draft scales"""
+    print("📝 Draft preview scale (5 slides, cold caches, render + PNG encode)")
+    slides = carousel_fixture(5)
+    timings = {}
+
+    for scale in (1.0, 0.5, 0.25):
+        generator = engine.CarouselGenerator(benchmark_theme(), scale=scale)
+
+        def preview():
+            reset_render_caches()
+            for img in generator.render_carousel(slides, CUSTOM_SIZES, workers=1):
+                img.save(io.BytesIO(), format="PNG")
+        timings[scale] = time_call(preview, repeat=3)
+
+        size = generator.canvas_size
+        print(f"   {scale:4.2f}x ({size[0]}x{size[1]})  {timings[scale]:7.1f} ms | "
+              f"{timings[1.0] / timings[scale]:4.1f}x")
+
+    return {f"{scale}x_ms": ms for scale, ms in timings.items()}
+
+
+def benchmark_encode():
+    """Encode time and output size of a 5-slide carousel in each download format, serial vs parallel"""
+    cores = os.cpu_count() or 1
+    print(f"💾 Export encoding (5 slides, {cores} cores available)")
+    generator = engine.CarouselGenerator(benchmark_theme())
+    images = generator.render_carousel(carousel_fixture(5), CUSTOM_SIZES)
+    results = {}
+
+    for export_format in engine.EXPORT_FORMATS:
+        pil_format, save_params = engine.export_save_params(export_format)
+        serial_ms = time_call(lambda: generator.encode_carousel(images, pil_format, workers=1, **save_params),
+                              repeat=3)
+        parallel_ms = time_call(lambda: generator.encode_carousel(images, pil_format, **save_params), repeat=3)
+        total_bytes = sum(len(data) for data in generator.encode_carousel(images, pil_format, **save_params))
+        print(f"   {export_format:<16} {serial_ms:7.1f} ms serial | {parallel_ms:7.1f} ms parallel | "
+              f"{total_bytes / 1024:6.0f} KB")
+        results[export_format] = {'serial_ms': serial_ms, 'parallel_ms': parallel_ms, 'bytes': total_bytes}
+
+    return results
+
+
+def benchmark_pdf():
+    """Build a 5-slide PDF with Pillow's save_all and with build_pdf from the stored PNG slides"""
+    print("📄 PDF export (5 slides, from PNG bytes as kept in the session store)")
+    generator = engine.CarouselGenerator(benchmark_theme())
+    images = generator.render_carousel(carousel_fixture(5), CUSTOM_SIZES)
+    store = engine.EncodedImageStore()
+    for index, img in enumerate(images):
+        store.put(index, img)
+    png_pages = [store.get_bytes(index) for index in range(len(images))]
+
+    def pillow_pdf():
+        # The previous export decoded every slide and let Pillow write JPEG pages
+        decoded = [Image.open(io.BytesIO(png)).convert("RGB") for png in png_pages]
+        buffer = io.BytesIO()
+        decoded[0].save(buffer, "PDF", save_all=True, append_images=decoded[1:])
+        return buffer.getvalue()
+
+    builders = {"pillow": pillow_pdf}
+    builders.update({page_format.lower(): (lambda page_format=page_format: engine.build_pdf(png_pages, page_format))
+                     for page_format in engine.PDF_PAGE_FORMATS})
+    results = {}
+    for name, build in builders.items():
+        build_ms = time_call(build, repeat=3)
+        size = len(build())
+        print(f"   {name:<9} {build_ms:7.1f} ms | {size / 1024:6.0f} KB")
+        results[name] = {'build_ms': build_ms, 'bytes': size}
+
+    return results
+
+
+def benchmark_photo():
+    """Cover-crop a 24 MP photo to a slide background: full decode + ImageOps.fit vs decode_cover_image"""
+    print("🖼️  Photo background (6000x4000 source, 1080x1080 cover crop)")
+    width, height = 6000, 4000
+    photo = Image.merge('RGB', [Image.linear_gradient('L').resize((width, height)),
+                                Image.radial_gradient('L').resize((width, height)),
+                                Image.effect_noise((width // 8, height // 8), 48).resize((width, height))])
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        for extension in ("jpg", "png"):
+            path = os.path.join(directory, f"photo.{extension}")
+            if extension == "jpg":
+                photo.save(path, quality=90)
+            else:
+                photo.save(path, compress_level=1)
+
+            def full_decode():
+                with Image.open(path) as src:
+                    return ImageOps.fit(src.convert('RGB'), engine.CarouselGenerator.INSTAGRAM_SIZE,
+                                        Image.Resampling.LANCZOS)
+
+            full_ms = time_call(full_decode, repeat=3)
+            cover_ms = time_call(lambda: engine.decode_cover_image(path), repeat=3)
+            draft_ms = time_call(lambda: engine.decode_cover_image(path, (540, 540)), repeat=3)
+            memo = engine.RenderMemo()
+            engine.get_photo_background(path, memo=memo)
+            memo_ms = time_call(lambda: engine.get_photo_background(path, memo=memo), repeat=20)
+            print(f"   {extension.upper():<4} full decode {full_ms:7.1f} ms | cover {cover_ms:6.1f} ms "
+                  f"({full_ms / cover_ms:4.1f}x) | draft preview {draft_ms:6.1f} ms | memoized {memo_ms:5.3f} ms")
+            results[extension] = {'full_decode_ms': full_ms, 'cover_ms': cover_ms, 'draft_preview_ms': draft_ms,
+                                  'memoized_ms': memo_ms}
+
+    return results
+
+
+def benchmark_memo():
+    """A second session's 5-slide render against the first, with and without a shared RenderMemo"""
+    print("🧠 Shared render memo (5 slides, second session vs first)")
+    theme = benchmark_theme()
+    slides = carousel_fixture(5)
+    results = {}
+
+    def render_session(memo):
+        # Per-slide text caches are reset so only what the memo holds carries over between sessions
+        reset_render_caches()
+        generator = engine.CarouselGenerator(theme, memo=memo)
+        encoded = {}
+        for slide in slides:
+            key = engine.slide_fingerprint(theme, slide, CUSTOM_SIZES)
+            data = memo.get('slides', key)
+            if data is None:
+                data = memo.put('slides', key, generator.encode_slide(generator.create_slide(slide, CUSTOM_SIZES),
+                                                                      "PNG", compress_level=1))
+            encoded[key] = data
+        return encoded
+
+    for name, shared in (("separate", False), ("shared", True)):
+        memo = engine.RenderMemo()
+        first_ms = time_call(lambda: render_session(memo), repeat=1)
+        if not shared:
+            memo = engine.RenderMemo()
+        second_ms = time_call(lambda: render_session(memo), repeat=1)
+        stats = memo.stats()
+        print(f"   {name:<9} memo: first {first_ms:7.1f} ms | second {second_ms:7.1f} ms | "
+              f"{stats['bytes_used'] / (1024**2):5.1f} MB, {stats['hit_rate']:.0%} hits")
+        results[name] = {'first_ms': first_ms, 'second_ms': second_ms, 'bytes_used': stats['bytes_used']}
+
+    return results
+
+
+def benchmark_layout():
+    """Compare laying out slides (LayoutPlan only) with laying out and rasterizing them"""
+    print("📐 Layout pass vs full render (cold caches)")
+    generator = engine.CarouselGenerator(benchmark_theme())
+    results = {}
+
+    for slide_count in (20, 200):
+        slides = carousel_fixture(slide_count)
+
+        def plan():
+            reset_render_caches()
+            generator.plan_carousel(slides, CUSTOM_SIZES)
+
+        def render():
+            reset_render_caches()
+            generator.render_carousel(slides, CUSTOM_SIZES, workers=1)
+
+        plan_ms = time_call(plan, repeat=3)
+        render_ms = time_call(render, repeat=3)
+        print(f"   {slide_count:>3} slides  plan {plan_ms:7.1f} ms | render {render_ms:7.1f} ms | "
+              f"plan is {plan_ms / render_ms:.0%} of the render cost")
+        results[f"{slide_count}_slides"] = {'plan_ms': plan_ms, 'render_ms': render_ms}
+
+    return results
+
+
+def benchmark_svg():
+    """Compare writing vector SVG slides with rasterizing and encoding PNGs at 1080 px"""
+    print("🖋️  SVG export vs 1080 px PNG (20 slides, cold caches)")
+    generator = engine.CarouselGenerator(benchmark_theme())
+    slides = carousel_fixture(20)
+
+    def svg():
+        reset_render_caches()
+        for slide in slides:
+            generator.create_svg_slide(slide, CUSTOM_SIZES)
+
+    def png():
+        reset_render_caches()
+        for img in generator.render_carousel(slides, CUSTOM_SIZES, workers=1):
+            img.save(io.BytesIO(), format="PNG")
+
+    svg_ms = time_call(svg, repeat=3)
+    png_ms = time_call(png, repeat=3)
+    svg_bytes = sum(len(generator.create_svg_slide(slide, CUSTOM_SIZES).encode("utf-8")) for slide in slides)
+    print(f"   svg {svg_ms:7.1f} ms | png {png_ms:7.1f} ms | {png_ms / svg_ms:5.1f}x | "
+          f"{svg_bytes / len(slides) / 1024:.1f} KB per SVG slide")
+    return {'svg_ms': svg_ms, 'png_ms': png_ms, 'svg_bytes_per_slide': svg_bytes / len(slides)}
+
+
+def benchmark_suite():
+    """Time create_slide, _wrap_text, _draw_text_with_effects and _apply_gradient per fixture"""
+    print("🧪 Hot path suite (create_slide cold/warm, wrap cold/warm, direct draw)")
+    generator = engine.CarouselGenerator(benchmark_theme())
+    results = {'fixtures': {}, 'apply_gradient': {}}
+
+    for name, slide in SUITE_FIXTURES.items():
+        results['fixtures'][name] = {}
+        for sizing, custom_sizes in SUITE_SIZINGS.items():
+            def cold():
+                reset_render_caches()
+                generator.create_slide(slide, custom_sizes)
+            create_cold_ms = time_call(cold)
+            create_warm_ms = time_call(lambda: generator.create_slide(slide, custom_sizes), repeat=20)
+
+            # The plan supplies the exact fonts and widths create_slide wraps and draws with
+            blocks = [(block, engine.font_registry.get(block.font_path, block.font_size))
+                      for block in generator.plan_slide(slide, custom_sizes).blocks]
+
+            def wrap():
+                for block, font in blocks:
+                    generator._wrap_text(block.text, None, font, block.max_width)
+            wrap_cold_ms = time_call(lambda: (generator._text_metrics._advances.clear(), wrap()))
+            wrap_warm_ms = time_call(wrap, repeat=20)
+
+            def draw_text():
+                draw = ImageDraw.Draw(Image.new('RGB', generator.INSTAGRAM_SIZE))
+                for block, font in blocks:
+                    generator._draw_text_with_effects(draw, block.text, (block.x, block.y), font, "#ffffff",
+                                                      block.align, max_width=block.max_width)
+            draw_ms = time_call(draw_text)
+
+            results['fixtures'][name][sizing] = {
+                'create_slide_cold_ms': create_cold_ms,
+                'create_slide_warm_ms': create_warm_ms,
+                'wrap_text_cold_ms': wrap_cold_ms,
+                'wrap_text_warm_ms': wrap_warm_ms,
+                'draw_text_with_effects_ms': draw_ms
+            }
+            print(f"   {name:<18} {sizing:<8} create {create_cold_ms:6.2f}/{create_warm_ms:5.2f} ms | "
+                  f"wrap {wrap_cold_ms:5.2f}/{wrap_warm_ms:5.3f} ms | draw {draw_ms:6.2f} ms")
+
+    theme = generator.theme
+    for direction in engine.GRADIENT_DIRECTIONS:
+        def apply_gradient():
+            generator._apply_gradient(Image.new('RGB', generator.INSTAGRAM_SIZE),
+                                      theme.primary_color, theme.secondary_color, direction=direction)
+        cold_ms = time_call(lambda: (engine.render_memo.clear('backgrounds'), apply_gradient()))
+        cached_ms = time_call(apply_gradient, repeat=20)
+        results['apply_gradient'][direction] = {'cold_ms': cold_ms, 'cached_ms': cached_ms}
+        print(f"   _apply_gradient {direction:<10} cold {cold_ms:6.2f} ms | cached {cached_ms:5.2f} ms")
+
+    return results
+
+
+BENCHMARKS = {
+    "suite": benchmark_suite,
+    "gradient": benchmark_gradient,
+    "outline": benchmark_outline,
+    "wrap": benchmark_wrap,
+    "text_blocks": benchmark_text_blocks,
+    "parallel": benchmark_parallel,
+    "draft": benchmark_draft,
+    "encode": benchmark_encode,
+    "pdf": benchmark_pdf,
+    "memo": benchmark_memo,
+    "photo": benchmark_photo,
+    "layout": benchmark_layout,
+    "svg": benchmark_svg,
+}
+
+
+def benchmark_metadata() -> Dict:
+    """Where and on what the results were measured, so runs from different commits line up"""
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, check=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    status = git("status", "--porcelain")
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git("rev-parse", "--short", "HEAD"),
+        'dirty': bool(status) if status is not None else None,
+        'python': platform.python_version(),
+        'pillow': PIL.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def flatten_timings(results: Dict, prefix: str = "") -> Dict[str, float]:
+    """Dotted-key view of every *_ms measurement in a results tree"""
+    timings = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            timings.update(flatten_timings(value, f"{path}."))
+        elif key.endswith("_ms"):
+            timings[path] = value
+    return timings
+
+
+def compare_results(baseline: Dict, results: Dict, threshold: float = 0.10):
+    """Print timings that moved by more than threshold against a baseline JSON report"""
+    before = flatten_timings(baseline['results'])
+    after = flatten_timings(results)
+    common = [key for key in after if key in before and before[key] > 0]
+    changed = [(key, after[key] / before[key] - 1) for key in common
+               if abs(after[key] / before[key] - 1) > threshold]
+
+    print(f"📊 Compared with {baseline['metadata'].get('commit') or 'baseline'}: "
+          f"{len(common)} timings, {len(changed)} changed by more than {threshold:.0%}")
+    for key, change in sorted(changed, key=lambda item: item[1]):
+        icon = "🟢" if change < 0 else "🔴"
+        print(f"   {icon} {key}: {before[key]:.2f} -> {after[key]:.2f} ms ({change:+.0%})")
+
+
+def main(argv: List[str] = None) -> bool:
+    """Run the selected benchmarks (all by default)"""
+    parser = argparse.ArgumentParser(description="Time the carousel rendering hot paths")
+    parser.add_argument("benchmarks", nargs="*", help=f"Benchmarks to run (default: all) - {', '.join(BENCHMARKS)}")
+    parser.add_argument("--json", type=Path, help="Write machine-readable results to this file")
+    parser.add_argument("--compare", type=Path, help="Compare against results previously written with --json")
+    args = parser.parse_args(argv)
+
+    print("🚀 Elite Systems AI - Rendering Benchmarks")
+    print("=" * 50)
+
+    selected = args.benchmarks or list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        print(f"❌ Unknown benchmark: {', '.join(unknown)} (choose from {', '.join(BENCHMARKS)})")
+        return False
+
+    results = {}
+    for name in selected:
+        results[name] = BENCHMARKS[name]()
+        print()
+
+    if args.json:
+        report = {'metadata': benchmark_metadata(), 'results': results}
+        args.json.write_text(json.dumps(report, indent=2))
+        print(f"📄 Results written to {args.json}")
+
+    if args.compare:
+        compare_results(json.loads(args.compare.read_text()), results)
+
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
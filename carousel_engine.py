@@ -0,0 +1,2294 @@
+"""
+Carousel rendering engine for the Instagram Carousel Generator
+Brand themes, slide models and the CarouselGenerator renderer - no Streamlit required
+"""
+
+from PIL import Image, ImageDraw, ImageFont
+import base64
+import io
+import os
+import struct
+import tempfile
+import unicodedata
+from typing import Callable, List, Dict, Optional, Tuple
+from dataclasses import dataclass, asdict, astuple
+import json
+import hashlib
+import logging
+import traceback
+import time
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from xml.sax.saxutils import escape, quoteattr
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class BrandTheme:
+    """Brand theme configuration"""
+    name: str
+    primary_color: str = "#667eea"
+    secondary_color: str = "#764ba2"
+    accent_color: str = "#f093fb"
+    background_color: str = "#000000"  # Default to black for cleaner look
+    text_color: str = "#ffffff"
+    font_family: str = "Arial"
+    logo_path: Optional[str] = None
+    # New style options
+    brand_handle: str = ""  # e.g., "elite.systemsai"
+    show_verified_badge: bool = True
+    title_style: str = "bold_italic"  # bold, italic, bold_italic, regular
+    gradient_direction: str = "vertical"  # vertical, horizontal, diagonal, radial
+    show_watermark: bool = False
+    show_slide_indicator: bool = False
+
+@dataclass
+class CarouselSlide:
+    """Individual carousel slide configuration"""
+    slide_number: int
+    title: str = ""
+    subtitle: str = ""
+    body_text: str = ""
+    bullet_points: List[str] = None
+    image_path: Optional[str] = None
+    layout: str = "center"  # center, left, right, split
+    background_style: str = "solid"  # solid, gradient, image (default to solid black)
+    emphasis_word: str = ""  # Word to emphasize differently in title
+    slide_type: str = "content"  # cover, content, cta
+
+@dataclass
+class TextBlockPlan:
+    """One positioned text block of a LayoutPlan, in full-resolution coordinates"""
+    role: str  # title, subtitle, body, bullet
+    text: str
+    lines: List[Tuple[str, int]]  # (line, width in pixels)
+    font_path: Optional[str]
+    font_size: int
+    align: str
+    x: int  # Anchor x - the block's center for centered text
+    y: int  # Top of the first line
+    max_width: int
+    height: int
+
+@dataclass
+class LayoutPlan:
+    """Everything create_slide decides before drawing - fonts, line breaks and positions"""
+    slide_number: int
+    background_style: str
+    show_brand_handle: bool
+    blocks: List[TextBlockPlan]
+    font_scale: float  # Scale the layout solver applied to the base font sizes
+    content_height: int
+    overflow: bool  # Content did not fit, even at the minimum font scale
+    dropped_bullets: int = 0  # Bullets left out because they ran past the content area
+    truncated: bool = False  # Text was shortened to fit the slide
+    image_path: Optional[str] = None  # Photo behind an "image" background
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable form of the plan"""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LayoutPlan':
+        """Rebuild a plan from to_dict output, including one loaded back from JSON"""
+        blocks = [TextBlockPlan(**{**block, 'lines': [tuple(line) for line in block['lines']]})
+                  for block in data['blocks']]
+        return cls(**{**data, 'blocks': blocks})
+
+# Bump whenever a change alters rendered pixels, so renders cached on disk are not reused
+RENDERER_VERSION = "1"
+
+
+def slide_fingerprint(theme: BrandTheme, slide: CarouselSlide, custom_sizes: Dict = None,
+                      scale: float = 1.0) -> str:
+    """Stable hash of everything that changes a rendered slide"""
+    payload = {
+        'theme': asdict(theme),
+        'slide': asdict(slide),
+        'custom_sizes': custom_sizes or {},
+        'scale': scale,
+        'renderer': RENDERER_VERSION
+    }
+    if slide.background_style == "image" and slide.image_path:
+        # A photo replaced under the same path must not hit renders of the old one
+        payload['image_file'] = image_file_stamp(slide.image_path)
+    payload = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def slides_from_suggestions(suggestions: Dict) -> List[CarouselSlide]:
+    """Build hook, content and CTA slides from the structure get_ai_suggestions returns"""
+    slides = []
+
+    # Hook slide
+    slides.append(CarouselSlide(
+        slide_number=1,
+        title=suggestions['hook_slide']['title'],
+        subtitle=suggestions['hook_slide'].get('subtitle', ''),
+        layout="center",
+        background_style="gradient"
+    ))
+
+    # Content slides
+    for i, slide_data in enumerate(suggestions['content_slides'], start=2):
+        slides.append(CarouselSlide(
+            slide_number=i,
+            title=slide_data.get('title', f'Slide {i}'),
+            subtitle=slide_data.get('subtitle', ''),
+            bullet_points=slide_data.get('bullet_points', []),
+            layout="left",
+            background_style="gradient"
+        ))
+
+    # CTA slide
+    slides.append(CarouselSlide(
+        slide_number=len(slides) + 1,
+        title=suggestions['cta_slide']['title'],
+        subtitle=suggestions['cta_slide'].get('subtitle', ''),
+        body_text=suggestions['cta_slide'].get('action_text', ''),
+        layout="center",
+        background_style="gradient"
+    ))
+
+    return slides
+
+
+def post_copy_files(suggestions: Dict) -> List[Tuple[str, bytes]]:
+    """caption.txt and hashtags.txt for a carousel archive, from the AI suggestion structure"""
+    files = []
+    if suggestions.get('caption'):
+        files.append(("caption.txt", suggestions['caption'].encode("utf-8")))
+    hashtags = suggestions.get('hashtags')
+    if hashtags:
+        # Handle both string and list formats
+        text = hashtags if isinstance(hashtags, str) else " ".join(hashtags)
+        files.append(("hashtags.txt", text.encode("utf-8")))
+    return files
+
+
+# Download formats: PIL format, save parameters, file extension and MIME type
+EXPORT_FORMATS = {
+    "PNG": ("PNG", {}, "png", "image/png"),
+    "PNG (optimized)": ("PNG", {'optimize': True}, "png", "image/png"),
+    "WebP (lossless)": ("WEBP", {'lossless': True}, "webp", "image/webp"),
+    "JPEG": ("JPEG", {'quality': 95, 'subsampling': 0}, "jpg", "image/jpeg"),
+}
+DEFAULT_PNG_COMPRESS_LEVEL = 6  # zlib level 0-9; "PNG (optimized)" always searches at level 9
+
+
+def export_save_params(export_format: str, compress_level: int = DEFAULT_PNG_COMPRESS_LEVEL) -> Tuple[str, Dict]:
+    """PIL format and save parameters for an EXPORT_FORMATS entry"""
+    pil_format, save_params, _, _ = EXPORT_FORMATS[export_format]
+    save_params = dict(save_params)
+    if export_format == "PNG":
+        save_params['compress_level'] = compress_level
+    return pil_format, save_params
+
+
+# PDF export: "JPEG" pages are smallest, "Lossless" pages reuse PNG data without re-encoding
+PDF_PAGE_FORMATS = ("JPEG", "Lossless")
+PDF_JPEG_QUALITY = 85
+
+
+def _png_image_data(png: bytes) -> Optional[Tuple[int, int, bytes]]:
+    """Width, height and the zlib stream of a non-interlaced 8-bit RGB PNG, or None for other PNGs"""
+    if png[:8] != b'\x89PNG\r\n\x1a\n':
+        return None
+    position, header, idat = 8, None, []
+    while position < len(png):
+        length, chunk_type = struct.unpack_from('>I4s', png, position)
+        data = png[position + 8:position + 8 + length]
+        if chunk_type == b'IHDR':
+            header = struct.unpack('>IIBBBBB', data)
+        elif chunk_type == b'IDAT':
+            idat.append(data)
+        elif chunk_type == b'IEND':
+            break
+        position += 12 + length
+
+    if header is None:
+        return None
+    width, height, bit_depth, color_type, _, _, interlace = header
+    if (bit_depth, color_type, interlace) != (8, 2, 0):
+        return None
+    return width, height, b''.join(idat)
+
+
+def _pdf_page_image(png: bytes, page_format: str, quality: int) -> Tuple[Dict, bytes]:
+    """Image XObject entries and stream data for one slide"""
+    if page_format == "Lossless":
+        image_data = _png_image_data(png)
+        if image_data is None:
+            # Palette, alpha or interlaced PNGs are re-encoded as plain RGB first
+            buffer = io.BytesIO()
+            Image.open(io.BytesIO(png)).convert("RGB").save(buffer, format="PNG")
+            image_data = _png_image_data(buffer.getvalue())
+        width, height, data = image_data
+        # PDF's Flate filter understands PNG's per-row filters through the predictor parameters
+        entries = {'Width': width, 'Height': height, 'Filter': '/FlateDecode',
+                   'DecodeParms': f'<< /Predictor 15 /Colors 3 /BitsPerComponent 8 /Columns {width} >>'}
+        return entries, data
+
+    img = Image.open(io.BytesIO(png)).convert("RGB")
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=quality)
+    return {'Width': img.width, 'Height': img.height, 'Filter': '/DCTDecode'}, buffer.getvalue()
+
+
+def build_pdf(png_pages: List[bytes], page_format: str = "JPEG", quality: int = PDF_JPEG_QUALITY,
+              workers: Optional[int] = None) -> bytes:
+    """Write encoded PNG slides into a PDF with one full-bleed page per slide (1 px = 1 pt).
+
+    No Streamlit calls, so it can run on a worker thread; JPEG pages are encoded concurrently.
+    """
+    if page_format not in PDF_PAGE_FORMATS:
+        raise ValueError(f"page_format must be one of {PDF_PAGE_FORMATS}, got {page_format!r}")
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(png_pages) or 1))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="carousel-pdf") as pool:
+        images = list(pool.map(lambda png: _pdf_page_image(png, page_format, quality), png_pages))
+
+    # Objects 1 and 2 are the catalog and page tree, then an image, content stream and page per slide
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>']
+    kids = ' '.join(f'{5 + 3 * index} 0 R' for index in range(len(images)))
+    objects.append(f'<< /Type /Pages /Kids [{kids}] /Count {len(images)} >>'.encode())
+    for index, (entries, data) in enumerate(images):
+        image_ref, content_ref = 3 + 3 * index, 4 + 3 * index
+        width, height = entries['Width'], entries['Height']
+        image_dict = ' '.join(f'/{key} {value}' for key, value in entries.items())
+        objects.append(f'<< /Type /XObject /Subtype /Image {image_dict} /ColorSpace /DeviceRGB '
+                       f'/BitsPerComponent 8 /Length {len(data)} >>\nstream\n'.encode() + data + b'\nendstream')
+        content = f'q {width} 0 0 {height} 0 0 cm /Slide Do Q'.encode()
+        objects.append(f'<< /Length {len(content)} >>\nstream\n'.encode() + content + b'\nendstream')
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] '
+                       f'/Resources << /XObject << /Slide {image_ref} 0 R >> >> '
+                       f'/Contents {content_ref} 0 R >>'.encode())
+
+    pdf = io.BytesIO()
+    pdf.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(pdf.tell())
+        pdf.write(f'{number} 0 obj\n'.encode() + body + b'\nendobj\n')
+
+    xref_offset = pdf.tell()
+    pdf.write(f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode())
+    pdf.write(''.join(f'{offset:010d} 00000 n \n' for offset in offsets).encode())
+    pdf.write(f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n'.encode())
+    return pdf.getvalue()
+
+
+def write_file_atomic(path: str, data: bytes):
+    """Write through a temp file in the same directory and rename it into place, so readers never see a partial file"""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def save_carousel(output_dir: str, name: str, png_pages: List[bytes], metadata: Dict = None,
+                  compress_level: int = DEFAULT_PNG_COMPRESS_LEVEL, workers: Optional[int] = None) -> Dict:
+    """Write a carousel's slides and a <name>.json manifest into output_dir, slides in parallel.
+
+    Slide files are named after a hash of their PNG data, so a slide that was saved before is
+    skipped without encoding it again. No Streamlit calls, so it can run on a worker thread.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    filenames = [f"slide_{hashlib.sha256(png).hexdigest()[:16]}.png" for png in png_pages]
+    # Identical slides within one carousel are written once
+    unique = dict(zip(filenames, png_pages))
+
+    def write_slide(filename: str, png: bytes) -> Tuple[bool, float]:
+        path = os.path.join(output_dir, filename)
+        if os.path.exists(path):
+            return False, 0.0
+        start = time.perf_counter()
+        buffer = io.BytesIO()
+        Image.open(io.BytesIO(png)).save(buffer, format="PNG", compress_level=compress_level)
+        encode_ms = (time.perf_counter() - start) * 1000
+        write_file_atomic(path, buffer.getvalue())
+        return True, encode_ms
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(unique) or 1))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="carousel-save") as pool:
+        results = list(pool.map(lambda item: write_slide(*item), unique.items()))
+
+    manifest = {
+        'name': name,
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        **(metadata or {}),
+        'slides': [
+            {'slide': number, 'file': filename, 'bytes': os.path.getsize(os.path.join(output_dir, filename))}
+            for number, filename in enumerate(filenames, start=1)
+        ]
+    }
+    manifest_path = os.path.join(output_dir, f"{name}.json")
+    write_file_atomic(manifest_path, json.dumps(manifest, indent=2).encode("utf-8"))
+
+    written = sum(1 for was_written, _ in results if was_written)
+    return {
+        'manifest': manifest_path,
+        'slides': len(filenames),
+        'written': written,
+        'skipped': len(unique) - written,  # Files already on disk from an earlier save
+        'duplicates': len(filenames) - len(unique),  # Slides identical to another slide of this carousel
+        'encode_ms': sum(encode_ms for _, encode_ms in results),
+        # Per-slide timings in CarouselGenerator.stage_timings form, for the render stage breakdown
+        'stage_timings': [{'encode': encode_ms} for was_written, encode_ms in results if was_written],
+        'bytes': sum(slide['bytes'] for slide in manifest['slides'])
+    }
+
+
+# Gradient engine
+GRADIENT_DIRECTIONS = ("vertical", "horizontal", "diagonal", "radial")
+
+
+def _hex_to_rgb(color: str) -> Tuple[int, int, int]:
+    """Convert a #rrggbb hex string to an RGB tuple"""
+    color = color.lstrip('#')
+    return tuple(int(color[i:i+2], 16) for i in (0, 2, 4))
+
+
+def _gradient_luts(colors: Tuple[str, ...]) -> List[List[int]]:
+    """Interpolate evenly spaced color stops into per-channel 256-entry lookup tables"""
+    stops = [_hex_to_rgb(color) for color in colors]
+    segments = len(stops) - 1
+    luts = [[], [], []]
+
+    for i in range(256):
+        position = i / 255 * segments
+        index = min(int(position), segments - 1)
+        ratio = position - index
+        start, end = stops[index], stops[index + 1]
+        for channel in range(3):
+            luts[channel].append(int(start[channel] * (1 - ratio) + end[channel] * ratio))
+
+    return luts
+
+
+def get_gradient_background(colors: Tuple[str, ...], direction: str = "vertical",
+                            size: Tuple[int, int] = (1080, 1080), memo: 'RenderMemo' = None) -> Image.Image:
+    """Render a multi-stop gradient once and memoize it by (colors, direction, size).
+
+    The returned image is shared between callers - paste or copy it, never draw on it.
+    """
+    memo = render_memo if memo is None else memo
+    return memo.get_or_create('backgrounds', (tuple(colors), direction, tuple(size)),
+                              lambda: render_gradient(colors, direction, size))
+
+
+def render_gradient(colors: Tuple[str, ...], direction: str = "vertical",
+                    size: Tuple[int, int] = (1080, 1080)) -> Image.Image:
+    """Render a multi-stop gradient in one pass, without memoizing it"""
+    if not colors:
+        raise ValueError("A gradient needs at least one color")
+    if len(colors) == 1:
+        return Image.new('RGB', size, colors[0])
+
+    luts = _gradient_luts(colors)
+    width, height = size
+
+    if direction == "radial":
+        # Center is the first stop, corners are the last stop
+        ramp = Image.radial_gradient('L').resize(size, Image.Resampling.BILINEAR)
+        return Image.merge('RGB', [ramp.point(lut) for lut in luts])
+
+    # Linear gradients only need one colorized strip, stretched across the canvas
+    length = {"vertical": height, "horizontal": width, "diagonal": width + height}.get(direction)
+    if length is None:
+        raise ValueError(f"Unknown gradient direction: {direction}")
+    ramp = Image.linear_gradient('L').resize((1, length), Image.Resampling.BILINEAR)
+    strip = Image.merge('RGB', [ramp.point(lut) for lut in luts])
+
+    if direction == "vertical":
+        return strip.resize(size, Image.Resampling.NEAREST)
+    if direction == "horizontal":
+        return strip.transpose(Image.Transpose.TRANSPOSE).resize(size, Image.Resampling.NEAREST)
+    # Diagonal: pixel (x, y) samples strip row x + y, top-left to bottom-right
+    return strip.transform(size, Image.Transform.AFFINE, (0, 0, 0, 1, 1, 0), Image.Resampling.NEAREST)
+
+
+# Photo backgrounds
+IMAGE_SCRIM = 0.35  # Darken photos by 35% so white text with its outline stays readable
+REDUCING_GAP = 2  # Integer-reduce no further than twice the target size, then resample with LANCZOS
+_EXIF_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+
+def image_file_stamp(path: Optional[str]) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a photo, or None when it cannot be read - changes whenever the file does"""
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError, ValueError):
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def decode_cover_image(path: str, size: Tuple[int, int] = (1080, 1080)) -> Image.Image:
+    """Decode a photo straight to a centered size cover crop without holding it at full resolution.
+
+    JPEGs are decoded at 1/2, 1/4 or 1/8 scale when that still covers the target (draft mode);
+    the crop is then integer-reduced to within REDUCING_GAP of the target and finished with LANCZOS.
+    """
+    with Image.open(path) as src:
+        orientation = src.getexif().get(0x0112, 1)
+        # EXIF-rotated photos are stored on their side: crop and resize in stored orientation
+        target = size[::-1] if orientation in (5, 6, 7, 8) else tuple(size)
+        src.draft('RGB', (max(target), max(target)))
+        img = src
+        if img.mode not in ('RGB', 'RGBA', 'L'):
+            img = img.convert('RGBA' if img.has_transparency_data else 'RGB')
+
+        # Centered crop with the target's aspect ratio
+        width, height = img.size
+        cover = max(target[0] / width, target[1] / height)
+        crop_width, crop_height = target[0] / cover, target[1] / cover
+        box = ((width - crop_width) / 2, (height - crop_height) / 2,
+               (width + crop_width) / 2, (height + crop_height) / 2)
+
+        factor = int(min(crop_width / target[0], crop_height / target[1]) / REDUCING_GAP)
+        if factor > 1:
+            # reduce only reads the crop and leaves the fractional edge to the resampling below
+            reduce_box = (int(box[0]), int(box[1]), min(width, -int(-box[2])), min(height, -int(-box[3])))
+            img = img.reduce(factor, reduce_box)
+            box = tuple((value - reduce_box[index % 2]) / factor for index, value in enumerate(box))
+        img = img.resize(target, Image.Resampling.LANCZOS, box=box)
+
+    if orientation in _EXIF_TRANSPOSE:
+        img = img.transpose(_EXIF_TRANSPOSE[orientation])
+    if img.mode == 'RGBA':
+        # Transparent areas show the default black background
+        background = Image.new('RGB', img.size, "#000000")
+        background.paste(img, mask=img)
+        return background
+    return img.convert('RGB')
+
+
+def get_photo_background(path: str, size: Tuple[int, int] = (1080, 1080),
+                         memo: 'RenderMemo' = None) -> Image.Image:
+    """A photo's darkened cover crop, decoded once per (file, mtime, crop) and memoized.
+
+    The returned image is shared between callers - paste or copy it, never draw on it.
+    Raises OSError when the file is missing or not an image.
+    """
+    stamp = image_file_stamp(path)
+    if stamp is None:
+        raise FileNotFoundError(f"Background image not found: {path}")
+    memo = render_memo if memo is None else memo
+    key = (os.path.abspath(path), stamp, ('cover', tuple(size)), IMAGE_SCRIM)
+    return memo.get_or_create('photos', key, lambda: decode_cover_image(path, size).point(
+        lambda value: int(value * (1 - IMAGE_SCRIM))))
+
+
+class FontRegistry:
+    """Process-wide, thread-safe font loader with a resolved fallback chain and a bounded LRU"""
+
+    # Probed once, in order - the first file that loads becomes the fallback font
+    FALLBACK_CHAIN = [
+        # Linux/Docker paths (Railway uses Nixpacks/Docker)
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+        "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+        "/usr/share/fonts/truetype/freefont/FreeSans.ttf",
+        "/usr/share/fonts/TTF/DejaVuSans.ttf",
+        # macOS fonts
+        "/System/Library/Fonts/Supplemental/Arial Unicode.ttf",
+        "/System/Library/Fonts/Apple Color Emoji.ttc",
+        "/Library/Fonts/Arial Unicode.ttf",
+        # Windows fonts
+        "C:/Windows/Fonts/arialuni.ttf",
+        "C:/Windows/Fonts/seguiemj.ttf",
+        # Generic font names (PIL will search system paths)
+        "Arial Unicode MS",
+        "DejaVu Sans",
+        "Liberation Sans",
+        "FreeSans",
+        "Noto Sans",
+        "Arial",
+    ]
+    MAX_FONTS = 128
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._font_cache = OrderedDict()
+        self._unavailable = set()  # Requested paths that failed to load, so they are probed once
+        self.hits = 0
+        self.misses = 0
+        self.fallback_path = self._resolve(self.FALLBACK_CHAIN)
+        logger.info(f"Font registry fallback: {self.fallback_path}")
+
+    @staticmethod
+    def _resolve(candidates: List[str]) -> Optional[str]:
+        """Return the first candidate font that FreeType can open"""
+        for font_path in candidates:
+            try:
+                ImageFont.truetype(font_path, 12)
+                return font_path
+            except (OSError, IOError):
+                continue
+        return None
+
+    def get(self, path: Optional[str], size: int) -> ImageFont.ImageFont:
+        """Return a font for (path, size), falling back to the resolved chain"""
+        key = (path, size)
+        with self._lock:
+            font = self._font_cache.get(key)
+            if font is not None:
+                self._font_cache.move_to_end(key)
+                self.hits += 1
+                return font
+
+            self.misses += 1
+            font = self._load(path, size)
+            self._font_cache[key] = font
+            if len(self._font_cache) > self.MAX_FONTS:
+                self._font_cache.popitem(last=False)
+            return font
+
+    def _load(self, path: Optional[str], size: int) -> ImageFont.ImageFont:
+        """Load a font file, then the resolved fallback, then Pillow's default font"""
+        if path and path not in self._unavailable:
+            try:
+                return ImageFont.truetype(path, size)
+            except (OSError, IOError):
+                self._unavailable.add(path)
+
+        if self.fallback_path:
+            return ImageFont.truetype(self.fallback_path, size)
+
+        try:
+            # Try default with size (PIL 10.0+)
+            return ImageFont.load_default(size)
+        except TypeError:
+            # Older PIL versions don't support size parameter
+            return ImageFont.load_default()
+
+    def __len__(self) -> int:
+        return len(self._font_cache)
+
+    def stats(self) -> Dict:
+        """Cache size and hit/miss counters for the analytics panel"""
+        lookups = self.hits + self.misses
+        return {
+            'fonts': len(self._font_cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+# Resolve the usable font files once per process
+font_registry = FontRegistry()
+
+
+def _read_cmap_ranges(path: str) -> Optional[List[Tuple[int, int]]]:
+    """Codepoint ranges mapped to a real glyph by a TrueType/OpenType font's Unicode cmaps.
+
+    Returns None when the file cannot be parsed, so callers treat its coverage as unknown.
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        offset = 0
+        if data[:4] == b'ttcf':
+            # Font collections: use the first face, as ImageFont.truetype does by default
+            offset = struct.unpack_from('>I', data, 12)[0]
+        num_tables = struct.unpack_from('>H', data, offset + 4)[0]
+        cmap_offset = None
+        for index in range(num_tables):
+            tag, _, table_offset, _ = struct.unpack_from('>4sIII', data, offset + 12 + 16 * index)
+            if tag == b'cmap':
+                cmap_offset = table_offset
+                break
+        if cmap_offset is None:
+            return None
+
+        codepoints = set()
+        ranges = []
+        num_subtables = struct.unpack_from('>H', data, cmap_offset + 2)[0]
+        for index in range(num_subtables):
+            platform_id, encoding_id, subtable_offset = struct.unpack_from('>HHI', data, cmap_offset + 4 + 8 * index)
+            # Unicode platform, or Windows BMP / full-repertoire Unicode
+            if not (platform_id == 0 or (platform_id == 3 and encoding_id in (1, 10))):
+                continue
+            table = cmap_offset + subtable_offset
+            table_format = struct.unpack_from('>H', data, table)[0]
+
+            if table_format == 4:
+                seg_count = struct.unpack_from('>H', data, table + 6)[0] // 2
+                ends = struct.unpack_from(f'>{seg_count}H', data, table + 14)
+                starts_at = table + 16 + 2 * seg_count
+                starts = struct.unpack_from(f'>{seg_count}H', data, starts_at)
+                deltas = struct.unpack_from(f'>{seg_count}h', data, starts_at + 2 * seg_count)
+                range_offsets_at = starts_at + 4 * seg_count
+                range_offsets = struct.unpack_from(f'>{seg_count}H', data, range_offsets_at)
+                for seg, (start, end) in enumerate(zip(starts, ends)):
+                    if start == 0xFFFF:
+                        continue
+                    for codepoint in range(start, end + 1):
+                        if range_offsets[seg]:
+                            glyph_at = (range_offsets_at + 2 * seg + range_offsets[seg]
+                                        + 2 * (codepoint - start))
+                            glyph = struct.unpack_from('>H', data, glyph_at)[0]
+                            glyph = (glyph + deltas[seg]) & 0xFFFF if glyph else 0
+                        else:
+                            glyph = (codepoint + deltas[seg]) & 0xFFFF
+                        if glyph:
+                            codepoints.add(codepoint)
+
+            elif table_format in (12, 13):
+                num_groups = struct.unpack_from('>I', data, table + 12)[0]
+                for group in range(num_groups):
+                    start, end, glyph = struct.unpack_from('>III', data, table + 16 + 12 * group)
+                    # Format 12 maps the first codepoint to glyph 0 (.notdef) when startGlyphID is 0
+                    if table_format == 12 and glyph == 0:
+                        start += 1
+                    if start <= end:
+                        ranges.append((start, end))
+
+        for codepoint in sorted(codepoints):
+            ranges.append((codepoint, codepoint))
+    except (OSError, struct.error, ValueError):
+        return None
+
+    # Merge overlapping and adjacent ranges
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class FontFallback:
+    """Per-codepoint font fallback: splits text into runs drawn with the first font that covers them.
+
+    Each font's cmap coverage is read once per process and run segmentation is cached per string,
+    so emoji, symbols and non-Latin text in AI output do not render as tofu boxes.
+    """
+
+    # Scalable fonts for symbols, emoji and other scripts, tried in order after the slide's own font.
+    # Bitmap-only colour emoji fonts cannot be drawn at arbitrary sizes, so they fail the probe
+    FALLBACK_CANDIDATES = [
+        # Linux/Docker paths
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+        "/usr/share/fonts/truetype/noto/NotoSans-Regular.ttf",
+        "/usr/share/fonts/truetype/noto/NotoSansSymbols-Regular.ttf",
+        "/usr/share/fonts/truetype/noto/NotoSansSymbols2-Regular.ttf",
+        "/usr/share/fonts/truetype/noto/NotoEmoji-Regular.ttf",
+        "/usr/share/fonts/truetype/ancient-scripts/Symbola_hint.ttf",
+        "/usr/share/fonts/truetype/freefont/FreeSerif.ttf",
+        "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+        "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
+        # macOS fonts
+        "/System/Library/Fonts/Supplemental/Arial Unicode.ttf",
+        "/System/Library/Fonts/Apple Symbols.ttf",
+        "/Library/Fonts/Arial Unicode.ttf",
+        # Windows fonts
+        "C:/Windows/Fonts/seguiemj.ttf",
+        "C:/Windows/Fonts/seguisym.ttf",
+        "C:/Windows/Fonts/arialuni.ttf",
+        "C:/Windows/Fonts/msyh.ttc",
+    ]
+    MAX_STRINGS = 4096
+
+    def __init__(self, candidates: List[str] = None):
+        self._lock = threading.Lock()
+        self._coverage = {}  # font path -> (range starts, range ends), or None when unknown
+        self._ascii = {}  # font path -> whether it covers printable ASCII
+        self._runs = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.fallback_paths = [
+            path for path in (candidates or self.FALLBACK_CANDIDATES)
+            if FontRegistry._resolve([path]) and self._ranges(path) is not None
+        ]
+        logger.info(f"Font fallback chain: {self.fallback_paths}")
+
+    def _ranges(self, path: str) -> Optional[Tuple[List[int], List[int]]]:
+        """Sorted (starts, ends) coverage of a font file, parsed once"""
+        if path not in self._coverage:
+            ranges = _read_cmap_ranges(path) if path else None
+            self._coverage[path] = (
+                ([start for start, _ in ranges], [end for _, end in ranges]) if ranges else None
+            )
+        return self._coverage[path]
+
+    def covers(self, path: Optional[str], codepoint: int) -> bool:
+        """True if the font maps the codepoint to a glyph - unknown coverage counts as covered"""
+        ranges = self._ranges(path)
+        if ranges is None:
+            return True
+        starts, ends = ranges
+        index = bisect_right(starts, codepoint) - 1
+        return index >= 0 and codepoint <= ends[index]
+
+    def runs(self, text: str, path: Optional[str]) -> List[Tuple[str, Optional[str]]]:
+        """Split text into (run, font path) pairs; a single run in `path` when it covers everything"""
+        # Most slide text is plain ASCII that every Latin font covers
+        if text.isascii() and self._covers_ascii(path):
+            return [(text, path)]
+
+        key = (text, path)
+        with self._lock:
+            runs = self._runs.get(key)
+            if runs is not None:
+                self._runs.move_to_end(key)
+                self.hits += 1
+                return runs
+
+            self.misses += 1
+            runs = self._segment(text, path)
+            self._runs[key] = runs
+            if len(self._runs) > self.MAX_STRINGS:
+                self._runs.popitem(last=False)
+            return runs
+
+    def font_runs(self, text: str, font: ImageFont.ImageFont) -> List[Tuple[str, ImageFont.ImageFont]]:
+        """Split text into (run, font) pairs, loading fallback fonts at the same size"""
+        path = getattr(font, 'path', None)
+        return [
+            (run, font if run_path == path else font_registry.get(run_path, font.size))
+            for run, run_path in self.runs(text, path)
+        ]
+
+    def _covers_ascii(self, path: Optional[str]) -> bool:
+        covered = self._ascii.get(path)
+        if covered is None:
+            covered = self._ascii[path] = all(self.covers(path, codepoint) for codepoint in range(0x20, 0x7F))
+        return covered
+
+    def _segment(self, text: str, path: Optional[str]) -> List[Tuple[str, Optional[str]]]:
+        runs = []
+        for char in text:
+            # Variation selectors, joiners and combining marks stay with the preceding character
+            if runs and unicodedata.category(char) in ('Mn', 'Me', 'Cf'):
+                runs[-1][0].append(char)
+                continue
+
+            codepoint = ord(char)
+            # Spaces between two fallback characters do not break their run
+            if runs and char.isspace() and self.covers(runs[-1][1], codepoint):
+                runs[-1][0].append(char)
+                continue
+
+            run_path = path
+            if not self.covers(path, codepoint):
+                # Characters no font covers stay in the slide's font
+                run_path = next((candidate for candidate in self.fallback_paths
+                                 if self.covers(candidate, codepoint)), path)
+
+            if runs and runs[-1][1] == run_path:
+                runs[-1][0].append(char)
+            else:
+                runs.append(([char], run_path))
+
+        return [(''.join(chars), run_path) for chars, run_path in runs]
+
+    def stats(self) -> Dict:
+        """Segmentation cache counters and the resolved fallback chain"""
+        lookups = self.hits + self.misses
+        return {
+            'strings': len(self._runs),
+            'fallback_fonts': len(self.fallback_paths),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+# Read candidate fonts' coverage once per process
+font_fallback = FontFallback()
+
+
+class TextMetrics:
+    """Cached advance widths per (font path, size) for linear-time line breaking"""
+
+    MAX_WORDS_PER_FONT = 4096
+
+    def __init__(self):
+        self._advances = {}
+        self._line_heights = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def font_key(font: ImageFont.ImageFont) -> Tuple:
+        """Identify a font by file and size so reloaded fonts share measurements"""
+        return (getattr(font, 'path', None) or id(font), getattr(font, 'size', 0))
+
+    def advance(self, font: ImageFont.ImageFont, word: str) -> float:
+        """Advance width of a single word, measured once per font"""
+        widths = self._advances.setdefault(self.font_key(font), {})
+        width = widths.get(word)
+        if width is not None:
+            self.hits += 1
+            return width
+
+        self.misses += 1
+        if len(widths) >= self.MAX_WORDS_PER_FONT:
+            widths.clear()
+        # Words with emoji or symbols are measured run by run in their fallback fonts
+        width = widths[word] = sum(run_font.getlength(run) for run, run_font in font_fallback.font_runs(word, font))
+        return width
+
+    def line_height(self, font: ImageFont.ImageFont) -> int:
+        """Height of one line of text, measured from the 'Ay' sample like the draw pass"""
+        key = self.font_key(font)
+        height = self._line_heights.get(key)
+        if height is None:
+            bbox = font.getbbox("Ay")
+            height = self._line_heights[key] = bbox[3] - bbox[1]
+        return height
+
+    def wrap(self, text: str, font: ImageFont.ImageFont, max_width: int) -> List[Tuple[str, int]]:
+        """Greedy line breaking with running width sums, returning (line, width) pairs"""
+        space = self.advance(font, " ")
+        lines = []
+        current_words = []
+        current_width = 0.0
+
+        for word in text.split():
+            width = self.advance(font, word)
+            if not current_words:
+                # Start a new line - an overlong word gets a line of its own
+                current_words, current_width = [word], width
+            elif current_width + space + width <= max_width:
+                current_words.append(word)
+                current_width += space + width
+            else:
+                lines.append((' '.join(current_words), round(current_width)))
+                current_words, current_width = [word], width
+
+        if current_words:
+            lines.append((' '.join(current_words), round(current_width)))
+
+        return lines
+
+
+class TextBlockCache:
+    """Memory-capped LRU of rasterized text blocks (RGBA sprites with their outline baked in)"""
+
+    MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._blocks = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple):
+        """Return (sprite, offset, height) for a block, or None on a miss"""
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is None:
+                self.misses += 1
+                return None
+            self._blocks.move_to_end(key)
+            self.hits += 1
+            return block
+
+    def put(self, key: Tuple, block: Tuple):
+        """Store a block, evicting least recently used blocks beyond the memory cap"""
+        sprite = block[0]
+        size = len(sprite.getbands()) * sprite.width * sprite.height if sprite else 0
+        with self._lock:
+            if key in self._blocks:
+                return
+            self._blocks[key] = block + (size,)
+            self.bytes_used += size
+            while self.bytes_used > self.max_bytes and len(self._blocks) > 1:
+                _, evicted = self._blocks.popitem(last=False)
+                self.bytes_used -= evicted[-1]
+
+    def stats(self) -> Dict:
+        """Block count, memory use and hit rate for the analytics panel"""
+        lookups = self.hits + self.misses
+        return {
+            'blocks': len(self._blocks),
+            'bytes_used': self.bytes_used,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+class EncodedImageStore:
+    """Rendered slides kept as compressed PNG bytes, decoded lazily through a small LRU.
+
+    Meant to live in one user's session: the encoded bytes stay within max_bytes by evicting
+    least recently used slides, except the pinned ones on screen, which can be re-rendered.
+    """
+
+    MAX_BYTES = 32 * 1024 * 1024
+    DECODED_SLOTS = 2
+    # Lossless and fast to encode and decode. Lossless WebP is smaller, but "PNG" downloads at
+    # compress level 1, the .png render cache files and Save to Project reuse these bytes as-is
+    FORMAT = "PNG"
+    SAVE_PARAMS = {'compress_level': 1}
+
+    def __init__(self, max_bytes: int = MAX_BYTES, decoded_slots: int = DECODED_SLOTS):
+        self.max_bytes = max_bytes
+        self.decoded_slots = decoded_slots
+        self._encoded = OrderedDict()  # key -> (bytes, (width, height))
+        self._decoded = OrderedDict()
+        self._pinned = set()
+        self.bytes_used = 0
+        self.decodes = 0
+        self.evictions = 0
+
+    def put(self, key, img: Image.Image, data: bytes = None):
+        """Store an image - it also becomes the most recently decoded one.
+
+        data is the image already encoded with FORMAT and SAVE_PARAMS, e.g. by
+        CarouselGenerator.encode_slide so the encode shows up in its stage timings.
+        """
+        if data is None:
+            buffer = io.BytesIO()
+            img.save(buffer, format=self.FORMAT, **self.SAVE_PARAMS)
+            data = buffer.getvalue()
+        self.put_bytes(key, data, img.size)
+        if key in self._encoded:
+            self._remember_decoded(key, img)
+
+    def put_bytes(self, key, data: bytes, size: Tuple[int, int] = None):
+        """Store an already encoded PNG, e.g. from the render cache, without decoding it"""
+        if size is None:
+            # Opening only parses the header
+            size = Image.open(io.BytesIO(data)).size
+        self.discard(key)
+        self._encoded[key] = (data, size)
+        self.bytes_used += len(data)
+        self._evict()
+
+    def get(self, key) -> Image.Image:
+        """The decoded image, from the decoded LRU or freshly decoded"""
+        img = self._decoded.get(key)
+        if img is not None:
+            self._decoded.move_to_end(key)
+            self._encoded.move_to_end(key)
+            return img
+
+        img = Image.open(io.BytesIO(self.get_bytes(key)))
+        img.load()
+        self.decodes += 1
+        self._remember_decoded(key, img)
+        return img
+
+    def get_bytes(self, key) -> bytes:
+        """The encoded PNG - st.image and downloads can use it without decoding"""
+        self._encoded.move_to_end(key)
+        return self._encoded[key][0]
+
+    def size(self, key) -> Tuple[int, int]:
+        return self._encoded[key][1]
+
+    def pin(self, keys):
+        """Protect the slides on screen from eviction (replacing the previous pins)"""
+        self._pinned = set(keys)
+        self._evict()
+
+    def discard(self, key):
+        entry = self._encoded.pop(key, None)
+        if entry is not None:
+            self.bytes_used -= len(entry[0])
+        self._decoded.pop(key, None)
+
+    def _remember_decoded(self, key, img: Image.Image):
+        self._decoded[key] = img
+        self._decoded.move_to_end(key)
+        while len(self._decoded) > self.decoded_slots:
+            self._decoded.popitem(last=False)
+
+    def _evict(self):
+        """Drop least recently used unpinned slides until the encoded bytes fit the budget"""
+        for key in list(self._encoded):
+            if self.bytes_used <= self.max_bytes:
+                break
+            if key not in self._pinned:
+                self.discard(key)
+                self.evictions += 1
+
+    def __contains__(self, key) -> bool:
+        return key in self._encoded
+
+    def __len__(self) -> int:
+        return len(self._encoded)
+
+    def stats(self) -> Dict:
+        """Memory use against the budget for the analytics panel"""
+        return {
+            'images': len(self._encoded),
+            'decoded': len(self._decoded),
+            'bytes_used': self.bytes_used,
+            'decoded_bytes': sum(len(img.getbands()) * img.width * img.height for img in self._decoded.values()),
+            'max_bytes': self.max_bytes,
+            'decodes': self.decodes,
+            'evictions': self.evictions
+        }
+
+
+class RenderCache:
+    """Content-addressed on-disk cache of encoded slide renders, shared by sessions and processes.
+
+    Keys are slide_fingerprint hashes (theme, slide, sizes, scale and RENDERER_VERSION). Files are
+    written atomically, so concurrent workers never read a partial PNG; reads refresh a file's
+    mtime and the least recently used files are deleted once the directory grows past max_bytes.
+    """
+
+    DEFAULT_DIRECTORY = os.path.join(tempfile.gettempdir(), "carousel_render_cache")
+    MAX_BYTES = 256 * 1024 * 1024
+    RESCAN_EVERY = 64  # Other processes write too, so re-measure the directory now and then
+    EVICT_TO = 0.9  # Evict down to 90% of max_bytes so the next few writes do not rescan
+    STALE_TEMP_SECONDS = 3600  # Temp files this old were left behind by a crashed writer
+
+    def __init__(self, directory: str = None, max_bytes: int = None):
+        self.directory = directory or os.environ.get("RENDER_CACHE_DIR") or self.DEFAULT_DIRECTORY
+        self.max_bytes = max_bytes or int(os.environ.get("RENDER_CACHE_MAX_MB", 0)) * 1024 * 1024 or self.MAX_BYTES
+        self._lock = threading.Lock()
+        self._disk_bytes = None  # Measured on the first write
+        self._puts_since_scan = 0
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0  # Encoded bytes served from the cache instead of being rendered
+        self.evictions = 0
+
+    def _path(self, key: str) -> str:
+        # Two-level fan-out keeps directories small
+        return os.path.join(self.directory, key[:2], f"{key}.png")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Encoded PNG for a fingerprint, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            # Missing, or evicted by another process between open and utime
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += len(data)
+        return data
+
+    def put(self, key: str, data: bytes):
+        """Store an encoded PNG, evicting least recently used renders beyond the size cap"""
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_file_atomic(path, data)
+        except OSError as e:
+            # A read-only or full disk only costs the cache, never the render
+            logger.warning(f"Render cache write failed: {str(e)}")
+            return
+
+        with self._lock:
+            self._puts_since_scan += 1
+            rescan = self._disk_bytes is None or self._puts_since_scan >= self.RESCAN_EVERY
+            if not rescan:
+                self._disk_bytes += len(data)
+                rescan = self._disk_bytes > self.max_bytes
+            if rescan:
+                self._puts_since_scan = 0
+                self._evict()
+
+    def _evict(self):
+        """Measure the directory and delete the oldest files until it fits max_bytes"""
+        entries = []
+        now = time.time()
+        for root, _, files in os.walk(self.directory):
+            for filename in files:
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                    if filename.endswith(".tmp") and now - stat.st_mtime > self.STALE_TEMP_SECONDS:
+                        os.unlink(path)
+                except OSError:
+                    continue
+                if filename.endswith(".png"):
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            self._disk_bytes = total
+            return
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes * self.EVICT_TO:
+                break
+            try:
+                os.unlink(path)
+                self.evictions += 1
+            except OSError:
+                pass  # Another process evicted it first
+            total -= size
+        self._disk_bytes = total
+
+    def stats(self) -> Dict:
+        """Hit rate, bytes served and disk use for the analytics panel"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'bytes_saved': self.bytes_saved,
+            'disk_bytes': self._disk_bytes or 0,
+            'max_bytes': self.max_bytes,
+            'evictions': self.evictions
+        }
+
+
+# Created lazily on first write, under RENDER_CACHE_DIR when set
+render_cache = RenderCache()
+
+
+class RenderMemo:
+    """Process-wide, thread-safe memo of render artefacts under one shared byte budget.
+
+    Entries live in namespaces ('backgrounds', 'sprites', 'slides', ...) but are evicted least
+    recently used first across all of them, so one busy namespace cannot grow past the budget.
+    Cached values are shared between threads - treat them as read-only.
+    """
+
+    MAX_BYTES = 192 * 1024 * 1024
+
+    def __init__(self, max_bytes: int = None):
+        self.max_bytes = max_bytes or int(os.environ.get("RENDER_MEMO_MAX_MB", 0)) * 1024 * 1024 or self.MAX_BYTES
+        self._entries = OrderedDict()  # (namespace, key) -> (value, nbytes)
+        self._lock = threading.Lock()
+        self._namespaces = {}  # namespace -> {'entries', 'bytes', 'hits', 'misses', 'evictions'}
+        self._creating = {}  # (namespace, key) -> lock held while one thread creates the value
+        self.bytes_used = 0
+
+    @staticmethod
+    def nbytes(value) -> int:
+        """Approximate memory held by an image, encoded bytes or a tuple of them"""
+        if isinstance(value, Image.Image):
+            return len(value.getbands()) * value.width * value.height
+        if isinstance(value, (bytes, bytearray)):
+            return len(value)
+        if isinstance(value, tuple):
+            return sum(RenderMemo.nbytes(item) for item in value)
+        return 0
+
+    def _counters(self, namespace: str) -> Dict:
+        return self._namespaces.setdefault(namespace, {'entries': 0, 'bytes': 0, 'hits': 0, 'misses': 0,
+                                                       'evictions': 0})
+
+    def get(self, namespace: str, key):
+        """The memoized value, or None on a miss"""
+        with self._lock:
+            counters = self._counters(namespace)
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                counters['misses'] += 1
+                return None
+            self._entries.move_to_end((namespace, key))
+            counters['hits'] += 1
+            return entry[0]
+
+    def put(self, namespace: str, key, value, nbytes: int = None):
+        """Store a value and return the memoized one - another thread may have stored it first"""
+        size = self.nbytes(value) if nbytes is None else nbytes
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is not None:
+                self._entries.move_to_end((namespace, key))
+                return entry[0]
+            if size > self.max_bytes:
+                return value  # Too big to memoize without evicting everything else
+            self._entries[(namespace, key)] = (value, size)
+            counters = self._counters(namespace)
+            counters['entries'] += 1
+            counters['bytes'] += size
+            self.bytes_used += size
+            self._evict()
+            return value
+
+    def get_or_create(self, namespace: str, key, factory):
+        """Memoized value, created by factory() on a miss - once, even when threads miss together"""
+        value = self.get(namespace, key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            creating = self._creating.setdefault((namespace, key), threading.Lock())
+        # Only this key waits; other lookups and creations go ahead
+        with creating:
+            with self._lock:
+                entry = self._entries.get((namespace, key))
+            if entry is not None:
+                return entry[0]
+            try:
+                return self.put(namespace, key, factory())
+            finally:
+                with self._lock:
+                    self._creating.pop((namespace, key), None)
+
+    def _evict(self):
+        while self.bytes_used > self.max_bytes and self._entries:
+            (namespace, _), (_, size) = self._entries.popitem(last=False)
+            counters = self._namespaces[namespace]
+            counters['entries'] -= 1
+            counters['bytes'] -= size
+            counters['evictions'] += 1
+            self.bytes_used -= size
+
+    def clear(self, namespace: str = None):
+        """Drop every entry, or only one namespace's - hit and miss counters are kept"""
+        with self._lock:
+            for entry_key in [entry_key for entry_key in self._entries
+                              if namespace is None or entry_key[0] == namespace]:
+                _, size = self._entries.pop(entry_key)
+                counters = self._namespaces[entry_key[0]]
+                counters['entries'] -= 1
+                counters['bytes'] -= size
+                self.bytes_used -= size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        """Memory use against the budget and hit rates, overall and per namespace, for the admin view"""
+        with self._lock:
+            namespaces = {}
+            for namespace, counters in self._namespaces.items():
+                lookups = counters['hits'] + counters['misses']
+                namespaces[namespace] = {**counters, 'hit_rate': counters['hits'] / lookups if lookups else 0.0}
+            hits = sum(counters['hits'] for counters in namespaces.values())
+            lookups = hits + sum(counters['misses'] for counters in namespaces.values())
+            return {
+                'entries': len(self._entries),
+                'bytes_used': self.bytes_used,
+                'max_bytes': self.max_bytes,
+                'hits': hits,
+                'misses': lookups - hits,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'namespaces': namespaces
+            }
+
+
+# Used by generators that are not given a memo, e.g. batch workers and benchmarks
+render_memo = RenderMemo()
+
+
+class StageTimer:
+    """Exclusive wall time per rendering stage - time spent in a nested stage is not counted twice"""
+
+    STAGES = ('background', 'layout', 'fonts', 'wrap', 'outline', 'encode')
+
+    def __init__(self):
+        self.timings = {}
+        self._stack = []  # [stage name, start time, time spent in nested stages]
+
+    def stage(self, name: str) -> 'StageTimer':
+        self._stack.append([name, time.perf_counter(), 0.0])
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        name, start, nested = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        self.timings[name] = self.timings.get(name, 0.0) + (elapsed - nested) * 1000
+        if self._stack:
+            self._stack[-1][2] += elapsed
+        return False
+
+
+class _NoStageTimer:
+    """Stand-in used outside create_slide, e.g. for plan_carousel or SVG export"""
+
+    def stage(self, name: str) -> '_NoStageTimer':
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_STAGE_TIMER = _NoStageTimer()
+
+
+class SlideCompositor:
+    """Stack a theme's pre-rendered static layers under each slide's text.
+
+    Backgrounds and layer sprites are memoized in the generator's RenderMemo, so every generator
+    sharing that memo reuses them.
+    """
+
+    def __init__(self, generator: 'CarouselGenerator'):
+        self.generator = generator
+
+    def compose(self, background_style: str, slide_number: int, show_brand_handle: bool,
+                image_path: Optional[str] = None) -> Image.Image:
+        """Return a fresh canvas with the background and static layers for a slide"""
+        theme = self.generator.theme
+        img = self.background(background_style, image_path).copy()
+
+        if show_brand_handle:
+            self._paste(img, self._sprite('brand_handle', lambda draw: self.generator._draw_brand_handle(draw, None)))
+        if getattr(theme, 'show_watermark', False):
+            self._paste(img, self._sprite('watermark', self.generator._add_watermark))
+        if getattr(theme, 'show_slide_indicator', False):
+            self._paste(img, self._sprite(('slide_indicator', slide_number),
+                                          lambda draw: self.generator._draw_slide_indicator(draw, slide_number)))
+
+        return img
+
+    def background(self, background_style: str, image_path: Optional[str] = None) -> Image.Image:
+        """Shared, read-only background for a style - copy before drawing on it"""
+        if background_style == "image" and image_path:
+            try:
+                return get_photo_background(image_path, self.generator.canvas_size, memo=self.generator.memo)
+            except OSError as e:
+                # A missing or unreadable photo leaves the default black background
+                logger.warning(f"Background image unavailable, using black: {str(e)}")
+        colors, direction = self.background_spec(background_style)
+        return get_gradient_background(colors, direction, self.generator.canvas_size, memo=self.generator.memo)
+
+    def background_spec(self, background_style: str) -> Tuple[Tuple[str, ...], str]:
+        """Color stops and gradient direction for a background style - one stop is a solid fill"""
+        theme = self.generator.theme
+        if background_style == "gradient":
+            return (theme.primary_color, theme.secondary_color), getattr(theme, 'gradient_direction', 'vertical')
+        if background_style == "solid":
+            return (theme.background_color or "#000000",), "vertical"
+        # Default to pure black for clean look
+        return ("#000000",), "vertical"
+
+    def _sprite(self, name, draw_layer) -> Tuple[Image.Image, Tuple[int, int]]:
+        """Render a static layer once per theme on a transparent canvas, cropped to its content"""
+        # (theme, canvas size, layer name, args) -> (RGBA sprite, offset)
+        key = (astuple(self.generator.theme), self.generator.canvas_size, name)
+        memo = self.generator.memo
+        sprite = memo.get('sprites', key)
+        if sprite is not None:
+            return sprite
+
+        layer = Image.new('RGBA', self.generator.INSTAGRAM_SIZE, (0, 0, 0, 0))
+        draw_layer(ImageDraw.Draw(layer))
+        bbox = layer.getbbox() or (0, 0, 1, 1)
+        sprite = (layer.crop(bbox), bbox[:2])
+
+        scale = self.generator.scale
+        if scale != 1.0:
+            # Layers are drawn in full-resolution coordinates, then shrunk once per theme for drafts
+            cropped, (x, y) = sprite
+            size = (max(1, round(cropped.width * scale)), max(1, round(cropped.height * scale)))
+            sprite = (cropped.resize(size, Image.Resampling.LANCZOS), (round(x * scale), round(y * scale)))
+
+        return memo.put('sprites', key, sprite)
+
+    @staticmethod
+    def _paste(img: Image.Image, sprite: Tuple[Image.Image, Tuple[int, int]]):
+        """Alpha-composite a sprite onto the RGB canvas using its own alpha as the mask"""
+        layer, offset = sprite
+        img.paste(layer, offset, layer)
+
+
+class CarouselGenerator:
+    """Generate Instagram carousel images with brand styling"""
+    
+    INSTAGRAM_SIZE = (1080, 1080)
+    SAFE_ZONE = 950  # Instagram safe zone for text
+    TEXT_PADDING = 80  # Padding around text areas
+    SECTION_SPACING = 60  # Increased spacing between text sections
+    LINE_SPACING_MULTIPLIER = 1.2  # Space between lines
+    MIN_FONT_SIZE = 24
+    MAX_FONT_SIZE = 80
+    COVER_CONTENT_TOP = 440  # Cover titles start below the brand handle
+    BASE_FONT_SIZES = {'title': 72, 'subtitle': 48, 'body': 36, 'bullet': 32}
+    MIN_LAYOUT_SCALE = 0.6  # Never shrink fonts below 60% of their base size
+    LAYOUT_SCALE_TOLERANCE = 0.02  # Binary search stops once the scale is this precise
+    LAYOUT_CACHE_SIZE = 256
+    DRAFT_SCALE = 0.5  # Preview renders at half size; exports always render at full size
+    
+    # Word advance cache shared by every generator
+    _text_metrics = TextMetrics()
+    # Rasterized title/subtitle/body/bullet blocks shared by every generator
+    _text_block_cache = TextBlockCache()
+    # Solved layouts keyed by slide text, theme font and base sizes
+    _layout_cache = OrderedDict()
+    _layout_cache_lock = threading.Lock()
+    
+    def __init__(self, theme: BrandTheme, scale: float = 1.0, memo: RenderMemo = None):
+        """scale < 1 renders a draft: layout is solved at full resolution and drawn proportionally smaller.
+
+        memo holds backgrounds and layer sprites; generators share the module's render_memo by default.
+        """
+        if not 0 < scale <= 1:
+            raise ValueError(f"scale must be in (0, 1], got {scale}")
+        self.theme = theme
+        self.scale = scale
+        self.canvas_size = tuple(round(side * scale) for side in self.INSTAGRAM_SIZE)
+        self.memo = render_memo if memo is None else memo
+        self.slides = []
+        self.layout_stats = []  # Solver iterations and timing for each slide created
+        self.stage_timings = []  # Per-slide milliseconds in each StageTimer stage
+        self.encode_stats = []  # Format, milliseconds and output bytes of each encode_slide call
+        self.failed_slides = []  # Numbers of slides that came back as error slides - never cache those
+        self._stage_local = threading.local()  # StageTimer of the slide this thread is creating
+        self.compositor = SlideCompositor(self)
+        
+    def create_slide(self, slide: CarouselSlide, custom_sizes: Dict = None) -> Image.Image:
+        """Create a single carousel slide with intelligent text positioning - minimalist style"""
+        try:
+            logger.info(f"Creating slide {slide.slide_number}: {slide.title[:50]}...")
+
+            timer = self._stage_local.timer = StageTimer()
+            try:
+                with timer.stage('layout'):
+                    plan = self.plan_slide(slide, custom_sizes)
+                img = self.render_plan(plan)
+            finally:
+                self._stage_local.timer = None
+            self.stage_timings.append({'slide_number': slide.slide_number, **timer.timings})
+
+            logger.info(f"Successfully created slide {slide.slide_number}")
+            return img
+            
+        except Exception as e:
+            logger.error(f"Failed to create slide {slide.slide_number}: {str(e)}")
+            logger.error(f"Slide details: {slide}")
+            logger.error(f"Exception traceback: {traceback.format_exc()}")
+            self.failed_slides.append(slide.slide_number)
+            
+            # Return a basic error slide
+            return self._create_error_slide(slide, e)
+
+    def plan_slide(self, slide: CarouselSlide, custom_sizes: Dict = None) -> LayoutPlan:
+        """Decide fonts, line breaks and positions for a slide without drawing anything"""
+        # Determine if this is a cover slide (first slide)
+        is_cover_slide = slide.slide_number == 1 or getattr(slide, 'slide_type', '') == 'cover'
+        has_brand_handle = is_cover_slide and bool(self.theme.brand_handle)
+
+        # Layout positions are in full-resolution (INSTAGRAM_SIZE) coordinates at every scale
+        # Calculate available content area - cover titles start below the brand handle
+        content_top = self.COVER_CONTENT_TOP if has_brand_handle else self.TEXT_PADDING
+        content_bottom = self.INSTAGRAM_SIZE[1] - 100
+        available_height = content_bottom - content_top
+
+        # Always center for clean minimalist look
+        x_offset = self.INSTAGRAM_SIZE[0] // 2
+        align = "center"
+
+        # Optimize content for available space
+        optimized_slide = self._optimize_content_for_space(slide)
+
+        # Calculate layout parameters from measured text
+        layout_info = self._calculate_layout_parameters(optimized_slide, available_height, custom_sizes)
+        fonts = self._load_layout_fonts(optimized_slide, layout_info, custom_sizes)
+
+        if has_brand_handle:
+            # Position title below brand handle
+            current_y = content_top
+        else:
+            # For content slides, center vertically
+            current_y = content_top + layout_info['top_margin']
+
+        blocks = []
+
+        def add_block(role: str, text: str, max_width: int, spacing: int):
+            nonlocal current_y
+            font = fonts[role]
+            lines = self._wrap_text_with_widths(text, font, max_width)
+            height = self._lines_height(font, len(lines))
+            blocks.append(TextBlockPlan(
+                role=role,
+                text=text,
+                lines=lines,
+                font_path=getattr(font, 'path', None),
+                font_size=font.size,
+                align=align,
+                x=x_offset,
+                y=current_y,
+                max_width=max_width,
+                height=height
+            ))
+            current_y += height + spacing
+
+        # Title, subtitle, then body text - all drawn in white with a black outline
+        if optimized_slide.title:
+            add_block('title', optimized_slide.title, self.SAFE_ZONE, self.SECTION_SPACING)
+        if optimized_slide.subtitle:
+            add_block('subtitle', optimized_slide.subtitle, self.SAFE_ZONE, self.SECTION_SPACING)
+        if optimized_slide.body_text:
+            add_block('body', optimized_slide.body_text, self.SAFE_ZONE, self.SECTION_SPACING)
+
+        # Bullet points with proper spacing
+        bullets = optimized_slide.bullet_points or []
+        dropped_bullets = 0
+        for index, bullet in enumerate(bullets):
+            # The layout solver sized everything to fit, so this only trips on overflow
+            if index and current_y >= content_bottom:
+                dropped_bullets = len(bullets) - index
+                break
+            add_block('bullet', f"• {bullet}", self.SAFE_ZONE - 40, self.SECTION_SPACING // 2)
+
+        truncated = (
+            (optimized_slide.title, optimized_slide.subtitle, optimized_slide.body_text, bullets)
+            != (slide.title, slide.subtitle, slide.body_text, slide.bullet_points or [])
+        )
+
+        return LayoutPlan(
+            slide_number=slide.slide_number,
+            background_style=slide.background_style,
+            show_brand_handle=has_brand_handle,
+            blocks=blocks,
+            font_scale=layout_info['scale'],
+            content_height=layout_info['content_height'],
+            overflow=layout_info['overflow'] or dropped_bullets > 0,
+            dropped_bullets=dropped_bullets,
+            truncated=truncated,
+            image_path=slide.image_path if slide.background_style == "image" else None
+        )
+
+    def plan_carousel(self, slides: List[CarouselSlide], custom_sizes: Dict = None) -> List[LayoutPlan]:
+        """Lay out many slides without rasterizing any of them, e.g. to check for overflow"""
+        return [self.plan_slide(slide, custom_sizes) for slide in slides]
+
+    def render_plan(self, plan: LayoutPlan) -> Image.Image:
+        """Rasterize a LayoutPlan - every layout decision comes from the plan"""
+        # Background, brand handle with verified badge, watermark and indicators come
+        # from layers pre-rendered once per theme
+        timer = self._stage_timer()
+        with timer.stage('background'):
+            img = self.compositor.compose(plan.background_style, plan.slide_number, plan.show_brand_handle,
+                                          plan.image_path)
+
+        for block in plan.blocks:
+            with timer.stage('fonts'):
+                font = font_registry.get(block.font_path, block.font_size)
+            with timer.stage('outline'):
+                self._paste_text_block(
+                    img, block.text, (block.x, block.y), font, block.align,
+                    max_width=block.max_width, add_shadow=False, lines=block.lines
+                )
+
+        return img
+
+    def encode_slide(self, img: Image.Image, format: str = "PNG", **save_params) -> bytes:
+        """Encode a rendered slide, recording the time as the slide's 'encode' stage"""
+        start = time.perf_counter()
+        buffer = io.BytesIO()
+        img.save(buffer, format=format, **save_params)
+        encode_ms = (time.perf_counter() - start) * 1000
+        self.stage_timings.append({'encode': encode_ms})
+        self.encode_stats.append({'format': format, 'ms': encode_ms, 'bytes': buffer.tell()})
+        return buffer.getvalue()
+
+    def encode_carousel(self, images: List[Image.Image], format: str = "PNG",
+                        workers: Optional[int] = None, **save_params) -> List[bytes]:
+        """Encode slides concurrently (Pillow's encoders release the GIL) and return them in order"""
+        if not images:
+            return []
+
+        workers = max(1, min(workers or os.cpu_count() or 1, len(images)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="carousel-encode") as pool:
+            return list(pool.map(lambda img: self.encode_slide(img, format, **save_params), images))
+
+    def _stage_timer(self):
+        """The StageTimer of the slide being created on this thread, or a no-op outside create_slide"""
+        return getattr(self._stage_local, 'timer', None) or _NO_STAGE_TIMER
+    
+    def _create_error_slide(self, slide: CarouselSlide, error: Exception) -> Image.Image:
+        """Plain red slide describing why rendering failed"""
+        error_img = Image.new('RGB', self.canvas_size, color='#ff0000')
+        error_draw = ImageDraw.Draw(error_img)
+        try:
+            error_font = ImageFont.load_default()
+            x, y = round(50 * self.scale), round(500 * self.scale)
+            error_draw.text((x, y), f"Error creating slide {slide.slide_number}", 
+                          fill='white', font=error_font)
+            error_draw.text((x, y + round(50 * self.scale)), f"Error: {str(error)[:100]}", 
+                          fill='white', font=error_font)
+        except:
+            pass  # If even error rendering fails, return blank red image
+        return error_img
+    
+    def render_carousel(self, slides: List[CarouselSlide], custom_sizes: Dict = None,
+                        workers: Optional[int] = None,
+                        progress_callback: Optional[Callable[[int, int, int, Image.Image], None]] = None
+                        ) -> List[Image.Image]:
+        """Render slides concurrently on a thread pool and return the images in slide order.
+
+        Slides start in list order. progress_callback(completed, total, slide_index, image) runs on
+        the calling thread as each slide finishes, so it can safely update Streamlit elements.
+        """
+        if not slides:
+            return []
+
+        workers = max(1, min(workers or os.cpu_count() or 1, len(slides)))
+        images = [None] * len(slides)
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="carousel-render") as pool:
+            futures = {pool.submit(self.create_slide, slide, custom_sizes): index
+                       for index, slide in enumerate(slides)}
+
+            for completed, future in enumerate(as_completed(futures), start=1):
+                index = futures[future]
+                try:
+                    images[index] = future.result()
+                except Exception as e:
+                    # create_slide already catches rendering errors - this covers anything else
+                    logger.error(f"Failed to render slide {slides[index].slide_number}: {str(e)}")
+                    self.failed_slides.append(slides[index].slide_number)
+                    images[index] = self._create_error_slide(slides[index], e)
+
+                if progress_callback:
+                    progress_callback(completed, len(slides), index, images[index])
+
+        return images
+    
+    def create_svg_slide(self, slide: CarouselSlide, custom_sizes: Dict = None) -> str:
+        """Lay out a slide exactly as create_slide does and write it as a vector SVG"""
+        return self.render_svg(self.plan_slide(slide, custom_sizes))
+
+    def render_svg(self, plan: LayoutPlan) -> str:
+        """Write a LayoutPlan as a resolution-independent SVG in INSTAGRAM_SIZE coordinates"""
+        width, height = self.INSTAGRAM_SIZE
+        parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+                 f'viewBox="0 0 {width} {height}">']
+        parts.extend(self._svg_background(plan.background_style, plan.image_path))
+
+        # Same layer order as SlideCompositor: brand handle, watermark, slide indicator, then text
+        if plan.show_brand_handle:
+            parts.extend(self._svg_brand_handle())
+        if getattr(self.theme, 'show_watermark', False):
+            parts.extend(self._svg_watermark())
+        if getattr(self.theme, 'show_slide_indicator', False):
+            for (x0, y0, x1, y1), color in self._slide_indicator_dots(plan.slide_number):
+                parts.append(f'<ellipse cx="{(x0 + x1) / 2:g}" cy="{(y0 + y1) / 2:g}" '
+                             f'rx="{(x1 - x0) / 2:g}" ry="{(y1 - y0) / 2:g}" fill="{color}"/>')
+
+        for block in plan.blocks:
+            parts.extend(self._svg_text_block(block))
+
+        parts.append('</svg>')
+        return '\n'.join(parts)
+
+    def _svg_font_family(self, font: ImageFont.ImageFont) -> str:
+        """CSS font-family list: the font the raster renderer used, then the theme font"""
+        families = [self.theme.font_family, "sans-serif"]
+        if hasattr(font, 'getname'):
+            families.insert(0, font.getname()[0])
+        return ", ".join(f"'{family}'" if family != "sans-serif" else family for family in families)
+
+    def _svg_background(self, background_style: str, image_path: Optional[str] = None) -> List[str]:
+        """Solid or gradient background rectangle, or the darkened photo embedded as a JPEG"""
+        if background_style == "image" and image_path:
+            try:
+                photo = get_photo_background(image_path, self.INSTAGRAM_SIZE, memo=self.memo)
+            except OSError as e:
+                logger.warning(f"Background image unavailable, using black: {str(e)}")
+            else:
+                buffer = io.BytesIO()
+                photo.save(buffer, format="JPEG", quality=85)
+                href = f"data:image/jpeg;base64,{base64.b64encode(buffer.getvalue()).decode('ascii')}"
+                return [f'<image width="100%" height="100%" preserveAspectRatio="xMidYMid slice" href="{href}"/>']
+        colors, direction = self.compositor.background_spec(background_style)
+        if len(colors) == 1:
+            return [f'<rect width="100%" height="100%" fill="{colors[0]}"/>']
+
+        stops = ''.join(f'<stop offset="{index / (len(colors) - 1):g}" stop-color="{color}"/>'
+                        for index, color in enumerate(colors))
+        if direction == "radial":
+            # Center is the first stop, the edges and corners the last - as in get_gradient_background
+            gradient = f'<radialGradient id="background" cx="0.5" cy="0.5" r="0.5">{stops}</radialGradient>'
+        else:
+            x2, y2 = {"vertical": (0, 1), "horizontal": (1, 0), "diagonal": (1, 1)}[direction]
+            gradient = f'<linearGradient id="background" x1="0" y1="0" x2="{x2}" y2="{y2}">{stops}</linearGradient>'
+        return [f'<defs>{gradient}</defs>', '<rect width="100%" height="100%" fill="url(#background)"/>']
+
+    def _svg_text(self, text: str, position: Tuple[int, int], font: ImageFont.ImageFont, fill: str,
+                  anchor: str = "start", extra: str = "") -> str:
+        """A <text> element whose top-left matches PIL's draw.text at the same position"""
+        # PIL positions text by the top of its ascender, SVG by the baseline
+        ascent = font.getmetrics()[0]
+        return (f'<text x="{position[0]}" y="{position[1] + ascent}" text-anchor="{anchor}" '
+                f'font-family={quoteattr(self._svg_font_family(font))} font-size="{font.size}" '
+                f'fill="{fill}"{extra}>{escape(text)}</text>')
+
+    def _svg_text_block(self, block: TextBlockPlan) -> List[str]:
+        """Each line of a planned text block with the same stroke outline as the raster slides"""
+        font = font_registry.get(block.font_path, block.font_size)
+        line_height = self._text_metrics.line_height(font)
+        line_spacing = int(line_height * 0.2)
+        outline_thickness = 4 if font.size > 50 else 3
+        anchor = {"center": "middle", "right": "end"}.get(block.align, "start")
+
+        # PIL strokes outwards by stroke_width; SVG strokes are centered on the outline, so double it
+        outline = (f' stroke="#000000" stroke-width="{2 * outline_thickness}" '
+                   f'stroke-linejoin="round" paint-order="stroke"')
+        return [
+            self._svg_text(line, (block.x, block.y + index * (line_height + line_spacing)), font,
+                           "#ffffff", anchor, outline)
+            for index, (line, _) in enumerate(block.lines)
+        ]
+
+    def _svg_brand_handle(self) -> List[str]:
+        """Brand handle text with its verified badge"""
+        layout = self._brand_handle_layout()
+        if layout is None:
+            return []
+
+        parts = [self._svg_text(layout['text'], layout['position'], layout['font'], "#ffffff")]
+        badge = layout['badge']
+        if badge:
+            x0, y0, x1, y1 = badge['box']
+            points = ' '.join(f'{x},{y}' for x, y in badge['check'])
+            parts.append(f'<circle cx="{(x0 + x1) / 2:g}" cy="{(y0 + y1) / 2:g}" r="{(x1 - x0) / 2:g}" fill="#1DA1F2"/>')
+            parts.append(f'<polyline points="{points}" fill="none" stroke="#ffffff" stroke-width="3"/>')
+        return parts
+
+    def _svg_watermark(self) -> List[str]:
+        """Brand watermark on its semi-transparent backing box"""
+        layout = self._watermark_layout()
+        x0, y0, x1, y1 = layout['box']
+        return [
+            f'<rect x="{x0}" y="{y0}" width="{x1 - x0}" height="{y1 - y0}" rx="5" '
+            f'fill="{self.theme.background_color}" fill-opacity="{128 / 255:.3f}"/>',
+            self._svg_text(layout['text'], layout['position'], layout['font'], self.theme.text_color)
+        ]
+    
+    def _load_fonts_with_emoji_support(self, custom_sizes: Dict):
+        """Load fonts with better emoji support for all platforms including Railway/Linux"""
+        # The registry resolved the first usable Unicode font once at startup; characters it
+        # lacks are drawn from font_fallback's chain one run at a time
+        return {
+            font_type: font_registry.get(None, custom_sizes[font_type])
+            for font_type in ['title', 'subtitle', 'body', 'bullet']
+        }
+    
+    def _get_contrast_color(self, background_style: str, is_subtitle: bool = False) -> str:
+        """Get appropriate text color based on background for better contrast"""
+        if background_style == "gradient":
+            # For gradients, use high contrast colors with thick outlines
+            if is_subtitle:
+                return "#ffffff"  # Pure white for maximum contrast
+            else:
+                return "#ffffff"  # Pure white for main text
+        elif background_style == "solid":
+            # For solid backgrounds, ensure high contrast
+            if self.theme.background_color == "#000000":
+                return "#ffffff"  # White on black
+            else:
+                return "#000000"  # Black on light backgrounds
+        else:
+            # Default to high contrast
+            return "#ffffff"
+        
+    def _apply_gradient(self, img: Image.Image, color1: str, color2: str, *more_colors: str,
+                        direction: str = "vertical"):
+        """Apply gradient background from the shared gradient cache"""
+        colors = (color1, color2) + more_colors
+        img.paste(get_gradient_background(colors, direction, img.size, memo=self.memo))
+            
+    def _calculate_layout_parameters(self, slide: CarouselSlide, available_height: int,
+                                     custom_sizes: Dict = None) -> Dict:
+        """Binary-search the largest font scale at which the measured slide content fits"""
+        base_sizes = dict(custom_sizes) if custom_sizes else dict(self.BASE_FONT_SIZES)
+        cache_key = self._layout_fingerprint(slide, available_height, base_sizes, bool(custom_sizes))
+        start_time = time.perf_counter()
+
+        with self._layout_cache_lock:
+            cached = self._layout_cache.get(cache_key)
+            if cached is not None:
+                self._layout_cache.move_to_end(cache_key)
+        if cached is not None:
+            self._record_layout_stats(slide, cached, 0, start_time, cached=True)
+            return dict(cached)
+
+        iterations = 0
+
+        def measure(scale: float) -> Tuple[int, Dict]:
+            nonlocal iterations
+            iterations += 1
+            sizes = self._scale_font_sizes(base_sizes, scale, bool(custom_sizes))
+            fonts = self._load_layout_fonts(slide, sizes, custom_sizes)
+            return self._measure_content_height(slide, fonts), sizes
+
+        scale = 1.0
+        content_height, sizes = measure(scale)
+
+        if content_height > available_height:
+            low, high = self.MIN_LAYOUT_SCALE, 1.0
+            low_height, low_sizes = measure(low)
+            scale, content_height, sizes = low, low_height, low_sizes
+
+            # Content that fits at the minimum scale can grow back towards 1.0
+            if low_height <= available_height:
+                while high - low > self.LAYOUT_SCALE_TOLERANCE:
+                    mid = (low + high) / 2
+                    mid_height, mid_sizes = measure(mid)
+                    if mid_height <= available_height:
+                        low = mid
+                        scale, content_height, sizes = mid, mid_height, mid_sizes
+                    else:
+                        high = mid
+
+        layout_info = {f'{element_type}_font_size': size for element_type, size in sizes.items()}
+        layout_info.update({
+            'top_margin': max(0, (available_height - content_height) // 2),
+            'content_height': content_height,
+            'scale': round(scale, 3),
+            'overflow': content_height > available_height
+        })
+
+        with self._layout_cache_lock:
+            self._layout_cache[cache_key] = layout_info
+            if len(self._layout_cache) > self.LAYOUT_CACHE_SIZE:
+                self._layout_cache.popitem(last=False)
+
+        self._record_layout_stats(slide, layout_info, iterations, start_time, cached=False)
+        return dict(layout_info)
+
+    def _layout_fingerprint(self, slide: CarouselSlide, available_height: int,
+                            base_sizes: Dict, custom: bool) -> Tuple:
+        """Everything the layout solver's result depends on"""
+        return (
+            slide.title or "",
+            slide.subtitle or "",
+            slide.body_text or "",
+            tuple(slide.bullet_points or ()),
+            available_height,
+            self.theme.font_family,
+            tuple(sorted(base_sizes.items())),
+            custom
+        )
+
+    def _scale_font_sizes(self, base_sizes: Dict, scale: float, custom: bool) -> Dict:
+        """Apply one scale factor to every element's base font size"""
+        sizes = {}
+        for element_type, base_size in base_sizes.items():
+            scaled_size = int(base_size * scale)
+            if custom:
+                # Respect the user's chosen sizes, only shrinking them as far as MIN_FONT_SIZE
+                sizes[element_type] = max(min(base_size, self.MIN_FONT_SIZE), scaled_size)
+            else:
+                sizes[element_type] = max(self.MIN_FONT_SIZE, min(self.MAX_FONT_SIZE, scaled_size))
+        return sizes
+
+    def _load_layout_fonts(self, slide: CarouselSlide, sizes: Dict, custom_sizes: Dict = None) -> Dict:
+        """Load the fonts for a set of element sizes (plain or *_font_size keys)"""
+        sizes = {element_type: sizes.get(f'{element_type}_font_size', sizes.get(element_type))
+                 for element_type in ('title', 'subtitle', 'body', 'bullet')}
+
+        with self._stage_timer().stage('fonts'):
+            # Get fonts with custom sizes if provided
+            if custom_sizes:
+                return self._load_fonts_with_emoji_support(sizes)
+
+            return {
+                'title': self._get_adaptive_font(slide.title or "", sizes['title']),
+                'subtitle': self._get_adaptive_font(slide.subtitle or "", sizes['subtitle']),
+                'body': self._get_adaptive_font(slide.body_text or "", sizes['body']),
+                'bullet': self._get_adaptive_font("", sizes['bullet'])
+            }
+
+    def _measure_content_height(self, slide: CarouselSlide, fonts: Dict) -> int:
+        """Measure the slide's text stack exactly as create_slide will draw it"""
+        blocks = []
+        if slide.title:
+            blocks.append((self._measure_text_height(None, slide.title, fonts['title'], self.SAFE_ZONE),
+                           self.SECTION_SPACING))
+        if slide.subtitle:
+            blocks.append((self._measure_text_height(None, slide.subtitle, fonts['subtitle'], self.SAFE_ZONE),
+                           self.SECTION_SPACING))
+        if slide.body_text:
+            blocks.append((self._measure_text_height(None, slide.body_text, fonts['body'], self.SAFE_ZONE),
+                           self.SECTION_SPACING))
+        for bullet in slide.bullet_points or []:
+            blocks.append((self._measure_text_height(None, f"• {bullet}", fonts['bullet'], self.SAFE_ZONE - 40),
+                           self.SECTION_SPACING // 2))
+
+        if not blocks:
+            return 0
+
+        # No spacing is needed after the last block
+        return sum(height + spacing for height, spacing in blocks) - blocks[-1][1]
+
+    def _record_layout_stats(self, slide: CarouselSlide, layout_info: Dict, iterations: int,
+                             start_time: float, cached: bool):
+        """Keep per-slide solver statistics for the analytics panel"""
+        stats = {
+            'slide_number': slide.slide_number,
+            'iterations': iterations,
+            'solve_time_ms': round((time.perf_counter() - start_time) * 1000, 2),
+            'cached': cached,
+            'scale': layout_info['scale'],
+            'overflow': layout_info['overflow']
+        }
+        self.layout_stats.append(stats)
+        logger.info(f"Layout for slide {slide.slide_number}: scale {stats['scale']}, "
+                    f"{iterations} iterations, {stats['solve_time_ms']} ms"
+                    f"{' (cached)' if cached else ''}")
+    
+    def _get_adaptive_font(self, text: str, base_size: int) -> ImageFont.ImageFont:
+        """Get font with size adapted to text length - with caching for performance"""
+        # Further reduce font size for very long text
+        char_count = len(text)
+        if char_count > 100:
+            size_reduction = min(12, (char_count - 100) // 20)
+            adjusted_size = max(self.MIN_FONT_SIZE, base_size - size_reduction)
+        else:
+            adjusted_size = base_size
+        
+        return font_registry.get(self.theme.font_family, adjusted_size)
+    
+    def _measure_text_height(self, draw, text: str, font: ImageFont.ImageFont, max_width: int) -> int:
+        """Measure the total height needed for wrapped text, matching _draw_text_with_effects"""
+        return self._lines_height(font, len(self._wrap_text(text, draw, font, max_width)))
+
+    def _lines_height(self, font: ImageFont.ImageFont, line_count: int) -> int:
+        """Height of line_count wrapped lines, including the spacing between them"""
+        if not line_count:
+            return 0
+            
+        # Get line height from font metrics
+        line_height = self._text_metrics.line_height(font)
+        
+        total_height = line_count * line_height
+        if line_count > 1:
+            total_height += (line_count - 1) * int(line_height * 0.2)  # Add line spacing
+            
+        return total_height
+    
+    def _wrap_text(self, text: str, draw, font: ImageFont.ImageFont, max_width: int) -> List[str]:
+        """Wrap text to fit within max_width, returning list of lines"""
+        return [line for line, _ in self._wrap_text_with_widths(text, font, max_width)]
+    
+    def _wrap_text_with_widths(self, text: str, font: ImageFont.ImageFont,
+                               max_width: int) -> List[Tuple[str, int]]:
+        """Wrap text to fit within max_width, returning (line, width) pairs from cached advances"""
+        with self._stage_timer().stage('wrap'):
+            return self._text_metrics.wrap(text, font, max_width)
+    
+    def _draw_text_with_effects(self, draw, text: str, position: Tuple[int, int], 
+                               font: ImageFont.ImageFont, color: str, align: str = "left", 
+                               max_width: int = 900, add_shadow: bool = False, scale: float = 1.0,
+                               lines: List[Tuple[str, int]] = None) -> int:
+        """Draw text with optional shadow/outline effects and return height used.
+
+        Lines always break and space as they would at full resolution; with scale < 1 they are
+        drawn with a proportionally smaller font, outline and shadow. The returned height is
+        in full-resolution pixels. Pre-wrapped (line, width) pairs from a LayoutPlan skip wrapping.
+        """
+        if lines is None:
+            lines = self._wrap_text_with_widths(text, font, max_width)
+        if not lines:
+            return 0
+            
+        # Get line height
+        line_height = self._text_metrics.line_height(font)
+        line_spacing = int(line_height * 0.2)
+        
+        # Always add strong outline for maximum readability on gradients
+        outline_color = "#000000"
+        outline_thickness = 4 if font.size > 50 else 3
+        shadow_offset = 6
+        draw_font = font
+        if scale != 1.0:
+            draw_font = font_registry.get(getattr(font, 'path', None), max(1, round(font.size * scale)))
+            outline_thickness = max(1, round(outline_thickness * scale))
+            shadow_offset = max(1, round(shadow_offset * scale))
+        
+        for index, (line, line_width) in enumerate(lines):
+            y = position[1] + round(index * (line_height + line_spacing) * scale)
+            line_width = round(line_width * scale)
+            
+            # Calculate x position based on alignment
+            if align == "center":
+                x = position[0] - line_width // 2
+            elif align == "right":
+                x = position[0] - line_width
+            else:
+                x = position[0]
+            
+            if add_shadow:
+                # Same stacking as the offset-grid outline: outline, then shadow, then the white text
+                self._draw_text_runs(draw, (x, y), line, draw_font, fill=outline_color,
+                                     stroke_width=outline_thickness, stroke_fill=outline_color)
+                self._draw_text_runs(draw, (x + shadow_offset, y + shadow_offset), line, draw_font, fill="#000000")
+                self._draw_text_runs(draw, (x, y), line, draw_font, fill="#ffffff")
+            else:
+                # Main white text with a thick black FreeType stroke in a single pass
+                self._draw_text_runs(draw, (x, y), line, draw_font, fill="#ffffff",
+                                     stroke_width=outline_thickness, stroke_fill=outline_color)
+            
+        return len(lines) * line_height + (len(lines) - 1) * line_spacing
+
+    def _draw_text_runs(self, draw, position: Tuple[int, int], text: str, font: ImageFont.ImageFont, **kwargs):
+        """Draw a line run by run in the first font covering each character, on a shared baseline"""
+        runs = font_fallback.font_runs(text, font)
+        if len(runs) == 1:
+            draw.text(position, text, font=font, **kwargs)
+            return
+
+        x, y = position
+        ascent = font.getmetrics()[0]
+        for run, run_font in runs:
+            draw.text((x, y + ascent - run_font.getmetrics()[0]), run, font=run_font, **kwargs)
+            x += run_font.getlength(run)
+            
+    def _paste_text_block(self, img: Image.Image, text: str, position: Tuple[int, int],
+                          font: ImageFont.ImageFont, align: str = "left",
+                          max_width: int = 900, add_shadow: bool = False,
+                          lines: List[Tuple[str, int]] = None) -> int:
+        """Paste a cached raster of a text block, rasterizing it on first use, and return height used.
+
+        position, max_width and the returned height are in full-resolution coordinates.
+        """
+        key = (text, TextMetrics.font_key(font), max_width, align, add_shadow, self.scale)
+        block = self._text_block_cache.get(key)
+        if block is None:
+            block = self._rasterize_text_block(text, font, align, max_width, add_shadow, self.scale, lines)
+            self._text_block_cache.put(key, block)
+
+        sprite, (anchor_x, anchor_y), height = block[:3]
+        if sprite is not None:
+            x, y = round(position[0] * self.scale), round(position[1] * self.scale)
+            img.paste(sprite, (x - anchor_x, y - anchor_y), sprite)
+        return height
+
+    def _rasterize_text_block(self, text: str, font: ImageFont.ImageFont, align: str,
+                              max_width: int, add_shadow: bool, scale: float = 1.0,
+                              lines: List[Tuple[str, int]] = None) -> Tuple:
+        """Draw a text block with its effects onto a transparent sprite cropped to the ink"""
+        if lines is None:
+            lines = self._wrap_text_with_widths(text, font, max_width)
+        if not lines:
+            return (None, (0, 0), 0)
+
+        # Leave room for the outline, shadow and glyphs that overhang their advance width
+        ascent, descent = (round(metric * scale) for metric in font.getmetrics())
+        margin = round((12 + font.size // 2) * scale)
+        widest = round(max(line_width for _, line_width in lines) * scale)
+        line_height = self._text_metrics.line_height(font)
+        block_height = round(len(lines) * (line_height + int(line_height * 0.2)) * scale)
+        canvas = Image.new('RGBA', (widest + 2 * margin, block_height + ascent + descent + 2 * margin), (0, 0, 0, 0))
+
+        anchor_x = {"center": margin + widest // 2, "right": margin + widest}.get(align, margin)
+        height = self._draw_text_with_effects(
+            ImageDraw.Draw(canvas), text, (anchor_x, margin), font, "#ffffff", align,
+            max_width=max_width, add_shadow=add_shadow, scale=scale, lines=lines
+        )
+
+        bbox = canvas.getbbox()
+        if bbox is None:
+            return (None, (0, 0), height)
+        return (canvas.crop(bbox), (anchor_x - bbox[0], margin - bbox[1]), height)
+
+    def _slide_indicator_dots(self, slide_number: int) -> List[Tuple[List[int], str]]:
+        """Bounding box and color of each slide indicator dot - minimalist dots at bottom"""
+        indicator_size = 8  # Smaller, more subtle dots
+        spacing = 16
+        margin = 50
+        y = self.INSTAGRAM_SIZE[1] - margin
+
+        # Only show if more than 1 slide
+        total_width = (10 * indicator_size) + (9 * spacing)
+        start_x = (self.INSTAGRAM_SIZE[0] - total_width) // 2
+
+        dots = []
+        for i in range(10):  # Max 10 slides
+            x = start_x + i * (indicator_size + spacing)
+            if i < slide_number:
+                color = "#ffffff"  # White filled for current/past
+            else:
+                color = "#404040"  # Subtle grey for future
+            dots.append(([x, y, x + indicator_size, y + indicator_size], color))
+        return dots
+
+    def _draw_slide_indicator(self, draw, slide_number):
+        """Draw slide number indicator - minimalist dots at bottom"""
+        for box, color in self._slide_indicator_dots(slide_number):
+            draw.ellipse(box, fill=color)
+
+    def _brand_handle_layout(self) -> Optional[Dict]:
+        """Font, text position and verified badge geometry of the brand handle, or None without one"""
+        if not self.theme.brand_handle:
+            return None
+
+        # Font for brand handle - smaller, clean
+        handle_font = font_registry.get(self.theme.font_family, 28)
+
+        # Construct handle text
+        handle_text = self.theme.brand_handle
+
+        # Calculate position - centered at top
+        bbox = handle_font.getbbox(handle_text)
+        text_width = bbox[2] - bbox[0]
+
+        # Add verified badge width if enabled
+        badge_width = 30 if self.theme.show_verified_badge else 0
+        total_width = text_width + badge_width + 10
+
+        x = (self.INSTAGRAM_SIZE[0] - total_width) // 2
+        y = 380  # Position in upper-middle area
+
+        layout = {'font': handle_font, 'text': handle_text, 'position': (x, y), 'badge': None}
+
+        # Verified badge (blue checkmark)
+        if self.theme.show_verified_badge:
+            badge_x = x + text_width + 10
+            badge_y = y + 2
+            badge_size = 24
+            layout['badge'] = {
+                'box': [badge_x, badge_y, badge_x + badge_size, badge_y + badge_size],
+                'check': [
+                    (badge_x + 6, badge_y + 12),
+                    (badge_x + 10, badge_y + 16),
+                    (badge_x + 18, badge_y + 8)
+                ]
+            }
+
+        return layout
+
+    def _draw_brand_handle(self, draw, img):
+        """Draw brand handle with verified badge at top of slide"""
+        layout = self._brand_handle_layout()
+        if layout is None:
+            return 0  # Return 0 height if no handle
+
+        # Draw handle text
+        draw.text(layout['position'], layout['text'], fill="#ffffff", font=layout['font'])
+
+        badge = layout['badge']
+        if badge:
+            # Blue circle background
+            draw.ellipse(badge['box'], fill="#1DA1F2")  # Twitter/IG blue
+
+            # White checkmark
+            draw.line(badge['check'], fill="#ffffff", width=3)
+
+        return 60  # Return height used
+
+    def _truncate_text_intelligently(self, text: str, max_length: int) -> str:
+        """Intelligently truncate text while preserving meaning"""
+        if len(text) <= max_length:
+            return text
+            
+        # Try to break at sentence boundaries first
+        sentences = text.split('. ')
+        if len(sentences) > 1:
+            result = sentences[0]
+            for sentence in sentences[1:]:
+                if len(result + '. ' + sentence) <= max_length - 3:
+                    result += '. ' + sentence
+                else:
+                    break
+            if len(result) < max_length - 3:
+                return result + '...'
+                
+        # Fall back to word boundaries
+        words = text.split()
+        result = []
+        current_length = 0
+        
+        for word in words:
+            if current_length + len(word) + len(result) <= max_length - 3:
+                result.append(word)
+                current_length += len(word)
+            else:
+                break
+                
+        return ' '.join(result) + '...' if result else text[:max_length-3] + '...'
+    
+    def _add_text_outline(self, draw, text: str, position: Tuple[int, int], 
+                         font: ImageFont.ImageFont, text_color: str, outline_color: str = "#000000"):
+        """Add outline effect to text for better readability"""
+        # Draw the main text with a one pixel stroke as the outline
+        draw.text(position, text, fill=text_color, font=font,
+                  stroke_width=1, stroke_fill=outline_color)
+    
+    def _optimize_content_for_space(self, slide: CarouselSlide) -> CarouselSlide:
+        """Optimize slide content to fit available space better"""
+        optimized_slide = CarouselSlide(
+            slide_number=slide.slide_number,
+            title=slide.title,
+            subtitle=slide.subtitle,
+            body_text=slide.body_text,
+            bullet_points=slide.bullet_points.copy() if slide.bullet_points else None,
+            image_path=slide.image_path,
+            layout=slide.layout,
+            background_style=slide.background_style
+        )
+        
+        # Intelligent title optimization
+        if optimized_slide.title and len(optimized_slide.title) > 60:
+            optimized_slide.title = self._truncate_text_intelligently(optimized_slide.title, 60)
+            
+        # Subtitle optimization
+        if optimized_slide.subtitle and len(optimized_slide.subtitle) > 80:
+            optimized_slide.subtitle = self._truncate_text_intelligently(optimized_slide.subtitle, 80)
+            
+        # Body text optimization
+        if optimized_slide.body_text and len(optimized_slide.body_text) > 200:
+            optimized_slide.body_text = self._truncate_text_intelligently(optimized_slide.body_text, 200)
+            
+        # Bullet points optimization
+        if optimized_slide.bullet_points:
+            optimized_bullets = []
+            for bullet in optimized_slide.bullet_points[:6]:  # Limit to 6 bullets
+                if len(bullet) > 60:
+                    bullet = self._truncate_text_intelligently(bullet, 60)
+                optimized_bullets.append(bullet)
+            optimized_slide.bullet_points = optimized_bullets
+            
+        return optimized_slide
+    
+    def _watermark_layout(self) -> Dict:
+        """Font, text position and backing box of the brand watermark"""
+        font = font_registry.get(self.theme.font_family, 18)
+
+        text = f"@{self.theme.name}"
+        bbox = font.getbbox(text)
+        x = self.INSTAGRAM_SIZE[0] - bbox[2] - 30
+        y = self.INSTAGRAM_SIZE[1] - bbox[3] - 30
+
+        # Add subtle background for watermark
+        padding = 8
+        bg_coords = [
+            x - padding, y - padding,
+            x + bbox[2] + padding, y + bbox[3] + padding
+        ]
+
+        return {'font': font, 'text': text, 'position': (x, y), 'box': bg_coords}
+
+    def _add_watermark(self, draw):
+        """Add brand watermark with improved styling"""
+        layout = self._watermark_layout()
+
+        # Semi-transparent background
+        draw.rounded_rectangle(layout['box'], radius=5,
+                             fill=(*_hex_to_rgb(self.theme.background_color), 128))
+
+        draw.text(layout['position'], layout['text'], fill=self.theme.text_color, font=layout['font'])
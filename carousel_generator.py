@@ -4,23 +4,46 @@ Interactive tool for creating branded carousel posts with AI assistance
 """
 
 import streamlit as st
-from PIL import Image, ImageDraw, ImageFont
 import os
 from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
 import json
 from datetime import datetime
 import io
+import copy
+import zipfile
 import base64
 from pathlib import Path
 import anthropic
 from dotenv import load_dotenv
 import logging
 import re
-import traceback
 import time
+import hashlib
+import tempfile
 import psutil
-from dataclasses import asdict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from carousel_engine import (
+    BrandTheme,
+    CarouselSlide,
+    CarouselGenerator,
+    DEFAULT_PNG_COMPRESS_LEVEL,
+    EXPORT_FORMATS,
+    EncodedImageStore,
+    GRADIENT_DIRECTIONS,
+    PDF_PAGE_FORMATS,
+    RenderMemo,
+    build_pdf,
+    export_save_params,
+    post_copy_files,
+    render_cache,
+    save_carousel,
+    font_fallback,
+    font_registry,
+    slide_fingerprint,
+    slides_from_suggestions,
+    write_file_atomic,
+)
 
 # Load environment variables
 load_dotenv()
@@ -72,13 +95,63 @@ class EliteAnalytics:
         except:
             return {'cpu_percent': 0, 'memory_percent': 0, 'memory_available_gb': 0}
     
-    def track_generation_performance(self, slides_count: int, generation_time: float, success: bool):
-        """Track carousel generation performance"""
+    def track_generation_performance(self, slides_count: int, generation_time: float, success: bool,
+                                     reused_slides: int = 0, cached_slides: int = 0):
+        """Track carousel generation performance - reused_slides includes those from the shared memo and render cache"""
         self.track_event('carousel_generation', {
             'slides_count': slides_count,
             'generation_time_seconds': generation_time,
             'success': success,
-            'avg_time_per_slide': generation_time / slides_count if slides_count > 0 else 0
+            'avg_time_per_slide': generation_time / slides_count if slides_count > 0 else 0,
+            'reused_slides': reused_slides,
+            'cached_slides': cached_slides,
+            'rendered_slides': slides_count - reused_slides
+        })
+    
+    def track_layout_performance(self, layout_stats: List[Dict]):
+        """Track layout solver search iterations and time for each slide"""
+        self.track_event('layout_solver', {
+            'slides': layout_stats,
+            'total_iterations': sum(stats['iterations'] for stats in layout_stats),
+            'total_time_ms': round(sum(stats['solve_time_ms'] for stats in layout_stats), 2),
+            'cache_hits': sum(1 for stats in layout_stats if stats['cached'])
+        })
+    
+    def track_stage_timings(self, stage_timings: List[Dict]):
+        """Add per-slide render stage timings (ms) to the session totals"""
+        stages = self.performance_metrics.setdefault('stages', {})
+        batch = {}
+        for timings in stage_timings:
+            for stage, ms in timings.items():
+                if stage == 'slide_number':
+                    continue
+                totals = stages.setdefault(stage, {'total_ms': 0.0, 'count': 0})
+                totals['total_ms'] += ms
+                totals['count'] += 1
+                batch[stage] = batch.get(stage, 0.0) + ms
+        self.track_event('render_stages', {stage: round(ms, 2) for stage, ms in batch.items()})
+    
+    def get_stage_breakdown(self) -> List[Dict]:
+        """Average time per slide and share of the session's render time for each stage, slowest first"""
+        stages = self.performance_metrics.get('stages', {})
+        total_ms = sum(totals['total_ms'] for totals in stages.values())
+        breakdown = [
+            {
+                'stage': stage,
+                'avg_ms': totals['total_ms'] / totals['count'],
+                'share': totals['total_ms'] / total_ms if total_ms else 0.0
+            }
+            for stage, totals in stages.items()
+        ]
+        return sorted(breakdown, key=lambda entry: entry['share'], reverse=True)
+    
+    def track_time_to_first_slide(self, seconds: float, slide_number: int, reused: bool):
+        """Track how long the user waited before the first preview slide appeared"""
+        self.performance_metrics.setdefault('time_to_first_slide', []).append(seconds)
+        self.track_event('time_to_first_slide', {
+            'seconds': seconds,
+            'slide_number': slide_number,
+            'reused': reused
         })
     
     def track_ai_usage(self, provider: str, success: bool, response_time: float = None):
@@ -96,6 +169,38 @@ class EliteAnalytics:
             'slides_count': slides_count
         })
     
+    def track_export_encoding(self, export_format: str, encode_stats: List[Dict]):
+        """Track encode time and output size of download files"""
+        self.performance_metrics.setdefault('export_encodes', []).extend(encode_stats)
+        self.track_event('export_encode', {
+            'format': export_format,
+            'slides_count': len(encode_stats),
+            'total_ms': round(sum(stats['ms'] for stats in encode_stats), 2),
+            'total_bytes': sum(stats['bytes'] for stats in encode_stats)
+        })
+    
+    def track_pdf_export(self, page_format: str, slides_count: int, build_seconds: float,
+                         size_bytes: int, cached: bool):
+        """Track PDF build time and file size"""
+        self.track_event('pdf_export', {
+            'page_format': page_format,
+            'slides_count': slides_count,
+            'build_seconds': build_seconds,
+            'size_bytes': size_bytes,
+            'cached': cached
+        })
+    
+    def track_project_save(self, summary: Dict, save_seconds: float):
+        """Track a completed background Save to Project"""
+        self.track_event('project_save', {
+            'slides_count': summary['slides'],
+            'written': summary['written'],
+            'skipped': summary['skipped'],
+            'encode_ms': round(summary['encode_ms'], 2),
+            'size_bytes': summary['bytes'],
+            'save_seconds': save_seconds
+        })
+    
     def get_session_summary(self):
         """Get analytics summary for the session"""
         total_events = len(self.events)
@@ -106,9 +211,13 @@ class EliteAnalytics:
             event_type = event['event_type']
             event_types[event_type] = event_types.get(event_type, 0) + 1
         
+        first_slide_times = self.performance_metrics.get('time_to_first_slide', [])
+        
         return {
             'session_duration_minutes': round(session_duration / 60, 2),
             'total_events': total_events,
+            'last_time_to_first_slide': first_slide_times[-1] if first_slide_times else None,
+            'stage_breakdown': self.get_stage_breakdown(),
             'event_breakdown': event_types,
             'final_system_info': self._get_system_info()
         }
@@ -732,613 +841,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@dataclass
-class BrandTheme:
-    """Brand theme configuration"""
-    name: str
-    primary_color: str = "#667eea"
-    secondary_color: str = "#764ba2"
-    accent_color: str = "#f093fb"
-    background_color: str = "#000000"  # Default to black for cleaner look
-    text_color: str = "#ffffff"
-    font_family: str = "Arial"
-    logo_path: Optional[str] = None
-    # New style options
-    brand_handle: str = ""  # e.g., "elite.systemsai"
-    show_verified_badge: bool = True
-    title_style: str = "bold_italic"  # bold, italic, bold_italic, regular
-
-@dataclass
-class CarouselSlide:
-    """Individual carousel slide configuration"""
-    slide_number: int
-    title: str = ""
-    subtitle: str = ""
-    body_text: str = ""
-    bullet_points: List[str] = None
-    image_path: Optional[str] = None
-    layout: str = "center"  # center, left, right, split
-    background_style: str = "solid"  # solid, gradient, image (default to solid black)
-    emphasis_word: str = ""  # Word to emphasize differently in title
-    slide_type: str = "content"  # cover, content, cta
-
-class CarouselGenerator:
-    """Generate Instagram carousel images with brand styling"""
-    
-    INSTAGRAM_SIZE = (1080, 1080)
-    SAFE_ZONE = 950  # Instagram safe zone for text
-    TEXT_PADDING = 80  # Padding around text areas
-    SECTION_SPACING = 60  # Increased spacing between text sections
-    LINE_SPACING_MULTIPLIER = 1.2  # Space between lines
-    MIN_FONT_SIZE = 24
-    MAX_FONT_SIZE = 80
-    
-    # Font cache for performance optimization
-    _font_cache = {}
-    
-    def __init__(self, theme: BrandTheme):
-        self.theme = theme
-        self.slides = []
-        
-    def create_slide(self, slide: CarouselSlide, custom_sizes: Dict = None) -> Image.Image:
-        """Create a single carousel slide with intelligent text positioning - minimalist style"""
-        try:
-            logger.info(f"Creating slide {slide.slide_number}: {slide.title[:50]}...")
-
-            # Create base image - default to pure black for clean look
-            img = Image.new('RGB', self.INSTAGRAM_SIZE, color='#000000')
-            draw = ImageDraw.Draw(img)
-
-            # Apply background based on style
-            if slide.background_style == "gradient":
-                self._apply_gradient(img, self.theme.primary_color, self.theme.secondary_color)
-                draw = ImageDraw.Draw(img)
-            elif slide.background_style == "solid":
-                bg_color = self.theme.background_color if self.theme.background_color else "#000000"
-                img = Image.new('RGB', self.INSTAGRAM_SIZE, bg_color)
-                draw = ImageDraw.Draw(img)
-
-            # Determine if this is a cover slide (first slide)
-            is_cover_slide = slide.slide_number == 1 or getattr(slide, 'slide_type', '') == 'cover'
-
-            # Calculate available content area
-            content_top = self.TEXT_PADDING
-            content_bottom = self.INSTAGRAM_SIZE[1] - 100
-            available_height = content_bottom - content_top
-
-            # Calculate layout parameters
-            layout_info = self._calculate_layout_parameters(slide, available_height)
-
-            # Always center for clean minimalist look
-            x_offset = self.INSTAGRAM_SIZE[0] // 2
-            align = "center"
-
-            # Optimize content for available space
-            optimized_slide = self._optimize_content_for_space(slide)
-
-            # Get fonts with custom sizes if provided
-            if custom_sizes:
-                fonts = self._load_fonts_with_emoji_support(custom_sizes)
-            else:
-                fonts = {
-                    'title': self._get_adaptive_font(optimized_slide.title or "", layout_info['title_font_size']),
-                    'subtitle': self._get_adaptive_font(optimized_slide.subtitle or "", layout_info['subtitle_font_size']),
-                    'body': self._get_adaptive_font(optimized_slide.body_text or "", layout_info['body_font_size']),
-                    'bullet': self._get_adaptive_font("", layout_info['bullet_font_size'])
-                }
-
-            # For cover slides: draw brand handle with verified badge
-            if is_cover_slide and self.theme.brand_handle:
-                self._draw_brand_handle(draw, img)
-                # Position title below brand handle
-                current_y = 440
-            else:
-                # For content slides, center vertically
-                current_y = content_top + layout_info['top_margin']
-
-            # Draw title with clean styling
-            if optimized_slide.title:
-                title_height = self._draw_text_with_effects(
-                    draw, optimized_slide.title, (x_offset, current_y),
-                    fonts['title'], "#ffffff", align,
-                    max_width=self.SAFE_ZONE, add_shadow=False
-                )
-                current_y += title_height + self.SECTION_SPACING
-
-            # Draw subtitle - slightly muted for hierarchy
-            if optimized_slide.subtitle:
-                # Use slightly dimmer white for subtitle
-                subtitle_color = "#e0e0e0" if is_cover_slide else "#c0c0c0"
-                subtitle_height = self._draw_text_with_effects(
-                    draw, optimized_slide.subtitle, (x_offset, current_y),
-                    fonts['subtitle'], subtitle_color, align,
-                    max_width=self.SAFE_ZONE, add_shadow=False
-                )
-                current_y += subtitle_height + self.SECTION_SPACING
-
-            # Draw body text
-            if optimized_slide.body_text:
-                body_height = self._draw_text_with_effects(
-                    draw, optimized_slide.body_text, (x_offset, current_y),
-                    fonts['body'], "#d0d0d0", align,
-                    max_width=self.SAFE_ZONE, add_shadow=False
-                )
-                current_y += body_height + self.SECTION_SPACING
-
-            # Draw bullet points with proper spacing
-            if optimized_slide.bullet_points:
-                for bullet in optimized_slide.bullet_points:
-                    bullet_text = f"• {bullet}"
-                    bullet_height = self._draw_text_with_effects(
-                        draw, bullet_text, (x_offset, current_y),
-                        fonts['bullet'], "#d0d0d0", align,
-                        max_width=self.SAFE_ZONE - 40, add_shadow=False
-                    )
-                    current_y += bullet_height + (self.SECTION_SPACING // 2)
-
-                    # Check if we're running out of space
-                    if current_y > content_bottom - 50:
-                        break
-
-            # Only show slide indicators for multi-slide carousels
-            # Skip watermark for cleaner look - brand handle serves this purpose
-            
-            logger.info(f"Successfully created slide {slide.slide_number}")
-            return img
-            
-        except Exception as e:
-            logger.error(f"Failed to create slide {slide.slide_number}: {str(e)}")
-            logger.error(f"Slide details: {slide}")
-            logger.error(f"Exception traceback: {traceback.format_exc()}")
-            
-            # Return a basic error slide
-            error_img = Image.new('RGB', self.INSTAGRAM_SIZE, color='#ff0000')
-            error_draw = ImageDraw.Draw(error_img)
-            try:
-                error_font = ImageFont.load_default()
-                error_draw.text((50, 500), f"Error creating slide {slide.slide_number}", 
-                              fill='white', font=error_font)
-                error_draw.text((50, 550), f"Error: {str(e)[:100]}", 
-                              fill='white', font=error_font)
-            except:
-                pass  # If even error rendering fails, return blank red image
-            return error_img
-    
-    def _load_fonts_with_emoji_support(self, custom_sizes: Dict):
-        """Load fonts with better emoji support for all platforms including Railway/Linux"""
-        # Extended font options with full paths for Linux/Docker environments
-        font_options = [
-            # Linux/Docker paths (Railway uses Nixpacks/Docker)
-            "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-            "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-            "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
-            "/usr/share/fonts/truetype/freefont/FreeSans.ttf",
-            "/usr/share/fonts/TTF/DejaVuSans.ttf",
-            # macOS fonts
-            "/System/Library/Fonts/Supplemental/Arial Unicode.ttf",
-            "/System/Library/Fonts/Apple Color Emoji.ttc",
-            "/Library/Fonts/Arial Unicode.ttf",
-            # Windows fonts
-            "C:/Windows/Fonts/arialuni.ttf",
-            "C:/Windows/Fonts/seguiemj.ttf",
-            # Generic font names (PIL will search system paths)
-            "Arial Unicode MS",
-            "DejaVu Sans",
-            "Liberation Sans",
-            "FreeSans",
-            "Noto Sans",
-            self.theme.font_family,
-            "Arial",
-        ]
-
-        fonts = {}
-        successful_font = None
-
-        for font_type in ['title', 'subtitle', 'body', 'bullet']:
-            size = custom_sizes[font_type]
-            font_loaded = False
-
-            # If we already found a working font, try it first
-            if successful_font:
-                try:
-                    fonts[font_type] = ImageFont.truetype(successful_font, size)
-                    font_loaded = True
-                except (OSError, IOError):
-                    pass
-
-            if not font_loaded:
-                for font_path in font_options:
-                    try:
-                        fonts[font_type] = ImageFont.truetype(font_path, size)
-                        font_loaded = True
-                        successful_font = font_path  # Remember this font works
-                        logger.info(f"Loaded font: {font_path} for {font_type}")
-                        break
-                    except (OSError, IOError):
-                        continue
-
-            if not font_loaded:
-                try:
-                    # Try default with size (PIL 10.0+)
-                    fonts[font_type] = ImageFont.load_default(size)
-                    logger.warning(f"Using default font for {font_type}")
-                except TypeError:
-                    # Older PIL versions don't support size parameter
-                    fonts[font_type] = ImageFont.load_default()
-                    logger.warning(f"Using basic default font for {font_type}")
-
-        return fonts
-    
-    def _get_contrast_color(self, background_style: str, is_subtitle: bool = False) -> str:
-        """Get appropriate text color based on background for better contrast"""
-        if background_style == "gradient":
-            # For gradients, use high contrast colors with thick outlines
-            if is_subtitle:
-                return "#ffffff"  # Pure white for maximum contrast
-            else:
-                return "#ffffff"  # Pure white for main text
-        elif background_style == "solid":
-            # For solid backgrounds, ensure high contrast
-            if self.theme.background_color == "#000000":
-                return "#ffffff"  # White on black
-            else:
-                return "#000000"  # Black on light backgrounds
-        else:
-            # Default to high contrast
-            return "#ffffff"
-        
-    def _apply_gradient(self, img: Image.Image, color1: str, color2: str):
-        """Apply gradient background"""
-        width, height = img.size
-        
-        # Convert hex to RGB
-        c1 = tuple(int(color1.lstrip('#')[i:i+2], 16) for i in (0, 2, 4))
-        c2 = tuple(int(color2.lstrip('#')[i:i+2], 16) for i in (0, 2, 4))
-        
-        # Create gradient
-        for y in range(height):
-            ratio = y / height
-            r = int(c1[0] * (1 - ratio) + c2[0] * ratio)
-            g = int(c1[1] * (1 - ratio) + c2[1] * ratio)
-            b = int(c1[2] * (1 - ratio) + c2[2] * ratio)
-            
-            draw = ImageDraw.Draw(img)
-            draw.rectangle([(0, y), (width, y+1)], fill=(r, g, b))
-            
-    def _calculate_layout_parameters(self, slide: CarouselSlide, available_height: int) -> Dict:
-        """Calculate optimal font sizes and spacing for the slide content"""
-        # Count content elements
-        elements = []
-        if slide.title: elements.append(('title', slide.title))
-        if slide.subtitle: elements.append(('subtitle', slide.subtitle))
-        if slide.body_text: elements.append(('body', slide.body_text))
-        if slide.bullet_points: 
-            for bullet in slide.bullet_points:
-                elements.append(('bullet', bullet))
-        
-        # Base font sizes
-        base_sizes = {
-            'title': 72,
-            'subtitle': 48, 
-            'body': 36,
-            'bullet': 32
-        }
-        
-        # Calculate total estimated height with base sizes
-        estimated_height = 0
-        for element_type, content in elements:
-            # Estimate lines needed
-            char_count = len(content)
-            estimated_lines = max(1, char_count // 50)  # Rough estimate
-            line_height = base_sizes[element_type] * self.LINE_SPACING_MULTIPLIER
-            estimated_height += estimated_lines * line_height + self.SECTION_SPACING
-        
-        # Scale fonts if content doesn't fit
-        scale_factor = 1.0
-        if estimated_height > available_height * 0.8:  # Use 80% of available height
-            scale_factor = (available_height * 0.8) / estimated_height
-            scale_factor = max(0.6, min(1.0, scale_factor))  # Limit scaling
-        
-        # Apply scaling and constraints
-        final_sizes = {}
-        for element_type, base_size in base_sizes.items():
-            scaled_size = int(base_size * scale_factor)
-            final_sizes[f'{element_type}_font_size'] = max(self.MIN_FONT_SIZE, min(self.MAX_FONT_SIZE, scaled_size))
-        
-        # Calculate top margin for vertical centering
-        final_estimated_height = estimated_height * scale_factor
-        top_margin = max(0, (available_height - final_estimated_height) // 2)
-        final_sizes['top_margin'] = top_margin
-        
-        return final_sizes
-    
-    def _get_adaptive_font(self, text: str, base_size: int) -> ImageFont.ImageFont:
-        """Get font with size adapted to text length - with caching for performance"""
-        # Further reduce font size for very long text
-        char_count = len(text)
-        if char_count > 100:
-            size_reduction = min(12, (char_count - 100) // 20)
-            adjusted_size = max(self.MIN_FONT_SIZE, base_size - size_reduction)
-        else:
-            adjusted_size = base_size
-        
-        # Create cache key
-        cache_key = f"{self.theme.font_family}_{adjusted_size}"
-        
-        # Check cache first
-        if cache_key in self._font_cache:
-            return self._font_cache[cache_key]
-            
-        # Load font and cache it
-        try:
-            font = ImageFont.truetype(self.theme.font_family, adjusted_size)
-            self._font_cache[cache_key] = font
-            return font
-        except:
-            # Cache the default font too
-            default_font = ImageFont.load_default()
-            self._font_cache[cache_key] = default_font
-            return default_font
-    
-    def _measure_text_height(self, draw, text: str, font: ImageFont.ImageFont, max_width: int) -> int:
-        """Measure the total height needed for wrapped text"""
-        lines = self._wrap_text(text, draw, font, max_width)
-        if not lines:
-            return 0
-            
-        # Get line height from font metrics
-        sample_bbox = draw.textbbox((0, 0), "Ay", font=font)
-        line_height = sample_bbox[3] - sample_bbox[1]
-        
-        total_height = len(lines) * line_height
-        if len(lines) > 1:
-            total_height += (len(lines) - 1) * (line_height * 0.2)  # Add line spacing
-            
-        return total_height
-    
-    def _wrap_text(self, text: str, draw, font: ImageFont.ImageFont, max_width: int) -> List[str]:
-        """Wrap text to fit within max_width, returning list of lines"""
-        words = text.split()
-        lines = []
-        current_line = []
-        
-        for word in words:
-            test_line = ' '.join(current_line + [word])
-            bbox = draw.textbbox((0, 0), test_line, font=font)
-            if bbox[2] - bbox[0] <= max_width:
-                current_line.append(word)
-            else:
-                if current_line:
-                    lines.append(' '.join(current_line))
-                    current_line = [word]
-                else:
-                    # Word is too long, force break
-                    lines.append(word)
-                    
-        if current_line:
-            lines.append(' '.join(current_line))
-            
-        return lines
-    
-    def _draw_text_with_effects(self, draw, text: str, position: Tuple[int, int], 
-                               font: ImageFont.ImageFont, color: str, align: str = "left", 
-                               max_width: int = 900, add_shadow: bool = False) -> int:
-        """Draw text with optional shadow/outline effects and return height used"""
-        lines = self._wrap_text(text, draw, font, max_width)
-        if not lines:
-            return 0
-            
-        # Get line height
-        sample_bbox = draw.textbbox((0, 0), "Ay", font=font)
-        line_height = sample_bbox[3] - sample_bbox[1]
-        line_spacing = int(line_height * 0.2)
-        
-        y = position[1]
-        
-        for line in lines:
-            bbox = draw.textbbox((0, 0), line, font=font)
-            line_width = bbox[2] - bbox[0]
-            
-            # Calculate x position based on alignment
-            if align == "center":
-                x = position[0] - line_width // 2
-            elif align == "right":
-                x = position[0] - line_width
-            else:
-                x = position[0]
-            
-            # Always add strong outline for maximum readability on gradients
-            outline_color = "#000000"
-            outline_thickness = 4 if font.size > 50 else 3
-            
-            # Draw thick black outline for maximum contrast
-            for dx in range(-outline_thickness, outline_thickness + 1):
-                for dy in range(-outline_thickness, outline_thickness + 1):
-                    if dx != 0 or dy != 0:
-                        draw.text((x + dx, y + dy), line, fill=outline_color, font=font)
-            
-            # Add additional shadow for extra depth if requested
-            if add_shadow:
-                shadow_offset = 6
-                draw.text((x + shadow_offset, y + shadow_offset), line, fill="#000000", font=font)
-            
-            # Draw main white text on top for maximum contrast
-            draw.text((x, y), line, fill="#ffffff", font=font)
-            y += line_height + line_spacing
-            
-        return len(lines) * line_height + (len(lines) - 1) * line_spacing
-            
-    def _draw_slide_indicator(self, draw, slide_number):
-        """Draw slide number indicator - minimalist dots at bottom"""
-        indicator_size = 8  # Smaller, more subtle dots
-        spacing = 16
-        margin = 50
-        y = self.INSTAGRAM_SIZE[1] - margin
-
-        # Only show if more than 1 slide
-        total_width = (10 * indicator_size) + (9 * spacing)
-        start_x = (self.INSTAGRAM_SIZE[0] - total_width) // 2
-
-        for i in range(10):  # Max 10 slides
-            x = start_x + i * (indicator_size + spacing)
-            if i < slide_number:
-                color = "#ffffff"  # White filled for current/past
-            else:
-                color = "#404040"  # Subtle grey for future
-            draw.ellipse([x, y, x + indicator_size, y + indicator_size], fill=color)
-
-    def _draw_brand_handle(self, draw, img):
-        """Draw brand handle with verified badge at top of slide"""
-        if not self.theme.brand_handle:
-            return 0  # Return 0 height if no handle
-
-        # Font for brand handle - smaller, clean
-        try:
-            handle_font = ImageFont.truetype(self.theme.font_family, 28)
-        except:
-            handle_font = ImageFont.load_default()
-
-        # Construct handle text
-        handle_text = self.theme.brand_handle
-
-        # Calculate position - centered at top
-        bbox = draw.textbbox((0, 0), handle_text, font=handle_font)
-        text_width = bbox[2] - bbox[0]
-
-        # Add verified badge width if enabled
-        badge_width = 30 if self.theme.show_verified_badge else 0
-        total_width = text_width + badge_width + 10
-
-        x = (self.INSTAGRAM_SIZE[0] - total_width) // 2
-        y = 380  # Position in upper-middle area
-
-        # Draw handle text
-        draw.text((x, y), handle_text, fill="#ffffff", font=handle_font)
-
-        # Draw verified badge (blue checkmark)
-        if self.theme.show_verified_badge:
-            badge_x = x + text_width + 10
-            badge_y = y + 2
-            badge_size = 24
-
-            # Blue circle background
-            draw.ellipse([badge_x, badge_y, badge_x + badge_size, badge_y + badge_size],
-                        fill="#1DA1F2")  # Twitter/IG blue
-
-            # White checkmark
-            check_points = [
-                (badge_x + 6, badge_y + 12),
-                (badge_x + 10, badge_y + 16),
-                (badge_x + 18, badge_y + 8)
-            ]
-            draw.line(check_points, fill="#ffffff", width=3)
-
-        return 60  # Return height used
-
-    def _truncate_text_intelligently(self, text: str, max_length: int) -> str:
-        """Intelligently truncate text while preserving meaning"""
-        if len(text) <= max_length:
-            return text
-            
-        # Try to break at sentence boundaries first
-        sentences = text.split('. ')
-        if len(sentences) > 1:
-            result = sentences[0]
-            for sentence in sentences[1:]:
-                if len(result + '. ' + sentence) <= max_length - 3:
-                    result += '. ' + sentence
-                else:
-                    break
-            if len(result) < max_length - 3:
-                return result + '...'
-                
-        # Fall back to word boundaries
-        words = text.split()
-        result = []
-        current_length = 0
-        
-        for word in words:
-            if current_length + len(word) + len(result) <= max_length - 3:
-                result.append(word)
-                current_length += len(word)
-            else:
-                break
-                
-        return ' '.join(result) + '...' if result else text[:max_length-3] + '...'
-    
-    def _add_text_outline(self, draw, text: str, position: Tuple[int, int], 
-                         font: ImageFont.ImageFont, text_color: str, outline_color: str = "#000000"):
-        """Add outline effect to text for better readability"""
-        x, y = position
-        # Draw outline by drawing text in multiple positions
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                if dx != 0 or dy != 0:  # Skip the center position
-                    draw.text((x + dx, y + dy), text, fill=outline_color, font=font)
-        # Draw the main text on top
-        draw.text((x, y), text, fill=text_color, font=font)
-    
-    def _optimize_content_for_space(self, slide: CarouselSlide) -> CarouselSlide:
-        """Optimize slide content to fit available space better"""
-        optimized_slide = CarouselSlide(
-            slide_number=slide.slide_number,
-            title=slide.title,
-            subtitle=slide.subtitle,
-            body_text=slide.body_text,
-            bullet_points=slide.bullet_points.copy() if slide.bullet_points else None,
-            image_path=slide.image_path,
-            layout=slide.layout,
-            background_style=slide.background_style
-        )
-        
-        # Intelligent title optimization
-        if optimized_slide.title and len(optimized_slide.title) > 60:
-            optimized_slide.title = self._truncate_text_intelligently(optimized_slide.title, 60)
-            
-        # Subtitle optimization
-        if optimized_slide.subtitle and len(optimized_slide.subtitle) > 80:
-            optimized_slide.subtitle = self._truncate_text_intelligently(optimized_slide.subtitle, 80)
-            
-        # Body text optimization
-        if optimized_slide.body_text and len(optimized_slide.body_text) > 200:
-            optimized_slide.body_text = self._truncate_text_intelligently(optimized_slide.body_text, 200)
-            
-        # Bullet points optimization
-        if optimized_slide.bullet_points:
-            optimized_bullets = []
-            for bullet in optimized_slide.bullet_points[:6]:  # Limit to 6 bullets
-                if len(bullet) > 60:
-                    bullet = self._truncate_text_intelligently(bullet, 60)
-                optimized_bullets.append(bullet)
-            optimized_slide.bullet_points = optimized_bullets
-            
-        return optimized_slide
-    
-    def _add_watermark(self, draw):
-        """Add brand watermark with improved styling"""
-        try:
-            font = ImageFont.truetype(self.theme.font_family, 18)
-        except:
-            font = ImageFont.load_default()
-            
-        text = f"@{self.theme.name}"
-        bbox = draw.textbbox((0, 0), text, font=font)
-        x = self.INSTAGRAM_SIZE[0] - bbox[2] - 30
-        y = self.INSTAGRAM_SIZE[1] - bbox[3] - 30
-        
-        # Add subtle background for watermark
-        padding = 8
-        bg_coords = [
-            x - padding, y - padding,
-            x + bbox[2] + padding, y + bbox[3] + padding
-        ]
-        
-        # Semi-transparent background
-        draw.rounded_rectangle(bg_coords, radius=5, 
-                             fill=(*tuple(int(self.theme.background_color.lstrip('#')[i:i+2], 16) for i in (0, 2, 4)), 128))
-        
-        draw.text((x, y), text, fill=self.theme.text_color, font=font)
-
 def sanitize_json_string(text: str) -> str:
     """Sanitize JSON string by removing invalid control characters"""
     if not text:
@@ -1607,6 +1109,302 @@ def generate_fallback_content(content_idea: str, num_slides: int) -> Dict:
         "caption": f"📍 {content_idea}\n\nSwipe through to discover actionable insights that will transform your approach.\n\nWhich tip resonated most with you? Let me know in the comments! 👇\n\nFollow for more daily tips and strategies."
     }
 
+# Uploaded background photos, stored under their content hash
+UPLOAD_DIR = os.path.join(tempfile.gettempdir(), "carousel_uploads")
+
+def save_uploaded_photo(uploaded_file) -> str:
+    """Write an uploaded photo to UPLOAD_DIR once - re-uploads keep the file's mtime, so cached renders still match"""
+    data = uploaded_file.getvalue()
+    extension = Path(uploaded_file.name).suffix.lower() or ".jpg"
+    path = os.path.join(UPLOAD_DIR, f"{hashlib.sha256(data).hexdigest()[:16]}{extension}")
+    if not os.path.exists(path):
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
+        write_file_atomic(path, data)
+        logger.info(f"Saved background photo {uploaded_file.name} ({len(data) / (1024**2):.1f} MB) to {path}")
+    return path
+
+@st.cache_resource
+def get_render_memo() -> RenderMemo:
+    """Process-wide memo of backgrounds, layer sprites and rendered slides, shared by every session"""
+    memo = RenderMemo()
+    logger.info(f"Shared render memo created with a {memo.max_bytes / (1024**2):.0f} MB budget")
+    return memo
+
+def get_export_fingerprints() -> List[str]:
+    """Full-resolution fingerprints of the last previewed carousel's slides"""
+    request = st.session_state.preview_request
+    return [slide_fingerprint(request['theme'], slide, request['custom_sizes']) for slide in request['slides']]
+
+def load_cached_renders(fingerprints: List[str], indices: List[int]) -> List[int]:
+    """Copy slides the shared memo or render cache already has into the session store; returns the indices left to render"""
+    store = st.session_state.image_store
+    memo = get_render_memo()
+    remaining = []
+    for i in indices:
+        # Slides another session rendered recently are still in memory, the rest may be on disk
+        data = memo.get('slides', fingerprints[i])
+        if data is None:
+            data = render_cache.get(fingerprints[i])
+            if data is not None:
+                memo.put('slides', fingerprints[i], data)
+        if data is None:
+            remaining.append(i)
+        else:
+            store.put_bytes(fingerprints[i], data)
+    return remaining
+
+def store_renders(generator: CarouselGenerator, slides: List[CarouselSlide], fingerprints: List[str],
+                  rendered: Dict[int, object], keep: List = ()) -> List:
+    """Keep new renders in the session store and share the successful ones through the memo and render cache.
+
+    Error slides are stored under ('error', fingerprint), so they can be shown but the next preview
+    still treats the slide as stale and retries it. The carousel's keys and `keep` are pinned before
+    anything is stored, so adding slides never evicts one the caller is about to read back.
+    Returns every slide's store key in order.
+    """
+    store = st.session_state.image_store
+    memo = get_render_memo()
+    keys = [('error', fingerprint) if i in rendered and slides[i].slide_number in generator.failed_slides
+            else fingerprint for i, fingerprint in enumerate(fingerprints)]
+    store.pin([*keep, *keys])
+    for i, img in rendered.items():
+        # Encoded through the generator so the time lands in its 'encode' stage
+        store.put(keys[i], img, generator.encode_slide(img, store.FORMAT, **store.SAVE_PARAMS))
+        if keys[i] == fingerprints[i] and keys[i] in store:
+            memo.put('slides', keys[i], store.get_bytes(keys[i]))
+            render_cache.put(keys[i], store.get_bytes(keys[i]))
+    return keys
+
+def render_export_images() -> List[str]:
+    """Make sure the session store holds the last previewed carousel at full resolution.
+
+    Slides are rendered on first export, then reused; returns their store keys in slide order
+    (error slides under their error key).
+    """
+    request = st.session_state.preview_request
+    theme, slides, custom_sizes = request['theme'], request['slides'], request['custom_sizes']
+    fingerprints = get_export_fingerprints()
+
+    # Previews rendered at full size share their fingerprints, so they can be exported as they are
+    store = st.session_state.image_store
+    # The preview on screen and the export's slides both have to survive what is stored next
+    keep = st.session_state.generated_fingerprints
+    store.pin([*keep, *fingerprints])
+    missing = load_cached_renders(fingerprints, [i for i, fingerprint in enumerate(fingerprints)
+                                                 if fingerprint not in store])
+    if not missing:
+        return fingerprints
+
+    generator = CarouselGenerator(theme, memo=get_render_memo())
+    with st.spinner(f"Rendering {len(missing)} slides at full resolution..."):
+        rendered = generator.render_carousel([slides[i] for i in missing], custom_sizes)
+    logger.info(f"Rendered {len(missing)} slides at full resolution for export")
+    keys = store_renders(generator, slides, fingerprints, dict(zip(missing, rendered)), keep=keep)
+    st.session_state.analytics.track_stage_timings(generator.stage_timings)
+    return keys
+
+def render_export_pages(theme: BrandTheme, slides: List[CarouselSlide], custom_sizes: Dict, fingerprints: List[str],
+                        pages: Dict[int, bytes], memo: RenderMemo) -> Tuple[List[bytes], List[int]]:
+    """Full-resolution PNG pages in slide order, rendering the ones missing from pages.
+
+    No Streamlit calls or session state, so background exports run it on their worker thread;
+    new renders go to the shared memo and render cache, where the next export finds them.
+    Also returns the numbers of slides that came back as error slides.
+    """
+    missing = []
+    for i, fingerprint in enumerate(fingerprints):
+        if i in pages:
+            continue
+        data = memo.get('slides', fingerprint)
+        if data is None:
+            data = render_cache.get(fingerprint)
+            if data is not None:
+                memo.put('slides', fingerprint, data)
+        if data is None:
+            missing.append(i)
+        else:
+            pages[i] = data
+
+    failed_slides = []
+    if missing:
+        generator = CarouselGenerator(theme, memo=memo)
+        for i, img in zip(missing, generator.render_carousel([slides[i] for i in missing], custom_sizes)):
+            pages[i] = generator.encode_slide(img, EncodedImageStore.FORMAT, **EncodedImageStore.SAVE_PARAMS)
+            if slides[i].slide_number not in generator.failed_slides:
+                memo.put('slides', fingerprints[i], pages[i])
+                render_cache.put(fingerprints[i], pages[i])
+        failed_slides = generator.failed_slides
+        logger.info(f"Rendered {len(missing)} slides at full resolution for a background export")
+
+    return [pages[i] for i in range(len(fingerprints))], failed_slides
+
+def export_job_args() -> tuple:
+    """render_export_pages arguments for the last previewed carousel, with the pages the session store holds"""
+    request = st.session_state.preview_request
+    fingerprints = get_export_fingerprints()
+    store = st.session_state.image_store
+    pages = {i: store.get_bytes(fingerprint) for i, fingerprint in enumerate(fingerprints) if fingerprint in store}
+    return request['theme'], request['slides'], request['custom_sizes'], fingerprints, pages, get_render_memo()
+
+def build_pdf_export(job_args: tuple, pdf_pages: str) -> Tuple[bytes, List[int]]:
+    """Render a carousel's missing pages and build its PDF - returns the PDF and any failed slide numbers"""
+    pages, failed_slides = render_export_pages(*job_args)
+    return build_pdf(pages, pdf_pages), failed_slides
+
+def export_file_keys(fingerprints: List[str], pil_format: str, save_params: Dict) -> List:
+    """export_bytes keys of a carousel's download files in one format"""
+    return [(fingerprint, pil_format, tuple(sorted(save_params.items()))) for fingerprint in fingerprints]
+
+def get_export_bytes(export_format: str, compress_level: int = DEFAULT_PNG_COMPRESS_LEVEL) -> List[bytes]:
+    """Download files for the last previewed carousel - each slide is encoded once per format"""
+    pil_format, save_params = export_save_params(export_format, compress_level)
+    fingerprints = get_export_fingerprints()
+    keys = export_file_keys(fingerprints, pil_format, save_params)
+    cache = st.session_state.export_bytes
+
+    if any(key not in cache for key in keys):
+        store_keys = render_export_images()
+        store = st.session_state.image_store
+        if (pil_format, save_params) == (store.FORMAT, store.SAVE_PARAMS):
+            # The session store already holds exactly these bytes
+            encoded = [store.get_bytes(store_key) for store_key in store_keys]
+        else:
+            missing = [i for i, key in enumerate(keys) if key not in cache]
+            encoder = CarouselGenerator(st.session_state.preview_request['theme'], memo=get_render_memo())
+            images = [store.get(store_keys[i]) for i in missing]
+            encoded = dict(zip(missing, encoder.encode_carousel(images, pil_format, **save_params)))
+            encoded = [encoded[i] if i in encoded else cache[key] for i, key in enumerate(keys)]
+            st.session_state.analytics.track_stage_timings(encoder.stage_timings)
+            st.session_state.analytics.track_export_encoding(export_format, encoder.encode_stats)
+        # Only the current carousel in the current format is kept, and never its error slides,
+        # so the next export renders those again
+        st.session_state.export_bytes = {key: data for key, fingerprint, store_key, data
+                                         in zip(keys, fingerprints, store_keys, encoded)
+                                         if store_key == fingerprint}
+        return encoded
+
+    return [cache[key] for key in keys]
+
+def run_in_background(func, *args) -> Future:
+    """Run an export on a worker thread - the future's result is (return value, seconds taken)"""
+    def timed():
+        start = time.perf_counter()
+        return func(*args), time.perf_counter() - start
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="carousel-export")
+    future = executor.submit(timed)
+    # The thread finishes the job even if a rerun stops this script run first
+    executor.shutdown(wait=False)
+    return future
+
+@st.fragment(run_every=1)
+def background_export_progress(job: Future, message: str):
+    """Poll a background export once a second, rerunning the page when it completes"""
+    if job.done():
+        st.rerun()
+    st.info(message)
+
+def show_project_save_status():
+    """Progress of the last Save to Project, then its result"""
+    save = st.session_state.project_save
+    if not save['job'].done():
+        background_export_progress(save['job'], "💾 Saving to carousel_output/ in the background...")
+        return
+
+    try:
+        summary, save_seconds = save['job'].result()
+    except Exception as e:
+        logger.error(f"Save to Project failed: {str(e)}")
+        st.error(f"❌ Save to Project failed: {str(e)}")
+        return
+
+    if not save['tracked']:
+        st.session_state.analytics.track_project_save(summary, save_seconds)
+        st.session_state.analytics.track_stage_timings(summary['stage_timings'])
+        save['tracked'] = True
+    duplicates = f", {summary['duplicates']} identical to another slide" if summary['duplicates'] else ""
+    st.success(f"✅ Saved {summary['slides']} images to carousel_output/ "
+               f"({summary['written']} written, {summary['skipped']} already saved{duplicates})")
+    st.caption(f"Manifest: {summary['manifest']}")
+
+def show_pdf_export_status(pdf_key: tuple, pdf_pages: str):
+    """Progress of the carousel's background PDF export, then its download button"""
+    pdf_export = st.session_state.pdf_exports[pdf_key]
+    if not pdf_export['job'].done():
+        background_export_progress(pdf_export['job'], "📄 Building PDF in the background...")
+        return
+
+    try:
+        (pdf_data, failed_slides), build_seconds = pdf_export['job'].result()
+    except Exception as e:
+        # Let the next click retry instead of caching the failure
+        st.session_state.pdf_exports.pop(pdf_key, None)
+        logger.error(f"PDF export failed: {str(e)}")
+        st.error(f"❌ PDF export failed: {str(e)}")
+        return
+
+    if not pdf_export['tracked']:
+        st.session_state.analytics.track_pdf_export(
+            pdf_pages, len(pdf_key[0]), build_seconds, len(pdf_data), pdf_export['cached']
+        )
+        pdf_export['tracked'] = True
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    st.download_button(
+        label="Download PDF",
+        data=pdf_data,
+        file_name=f"carousel_{timestamp}.pdf",
+        mime="application/pdf"
+    )
+    st.caption(f"{len(pdf_data) / 1024:.0f} KB, built in {build_seconds * 1000:.0f} ms"
+               f"{' (cached)' if pdf_export['cached'] else ''}")
+    if failed_slides:
+        # Offer this PDF once, but let the next click render the failed pages again
+        st.session_state.pdf_exports.pop(pdf_key, None)
+        st.warning(f"⚠️ Slides {', '.join(map(str, sorted(failed_slides)))} failed to render and are "
+                   f"error pages in this PDF - Export as PDF again to retry them")
+
+def build_carousel_zip(export_format: str, compress_level: int = DEFAULT_PNG_COMPRESS_LEVEL) -> bytes:
+    """One archive with every slide plus the caption and hashtags.
+
+    Slides are written to a temporary file a batch at a time - straight from the session store,
+    from download files already encoded in this format, or encoded for the archive alone - so the
+    finished archive, which st.download_button keeps in memory, is the only extra copy.
+    """
+    pil_format, save_params = export_save_params(export_format, compress_level)
+    _, _, extension, _ = EXPORT_FORMATS[export_format]
+    store_keys = render_export_images()
+    store = st.session_state.image_store
+    cache = st.session_state.export_bytes
+    file_keys = export_file_keys(get_export_fingerprints(), pil_format, save_params)
+    from_store = (pil_format, save_params) == (store.FORMAT, store.SAVE_PARAMS)
+    encoder = CarouselGenerator(st.session_state.preview_request['theme'], memo=get_render_memo())
+    batch_size = os.cpu_count() or 1
+
+    with tempfile.TemporaryFile() as archive_file:
+        with zipfile.ZipFile(archive_file, "w") as archive:
+            for start in range(0, len(store_keys), batch_size):
+                batch = range(start, min(start + batch_size, len(store_keys)))
+                to_encode = [i for i in batch if not from_store and file_keys[i] not in cache]
+                encoded = dict(zip(to_encode, encoder.encode_carousel([store.get(store_keys[i]) for i in to_encode],
+                                                                      pil_format, **save_params)))
+                for i in batch:
+                    if from_store:
+                        data = store.get_bytes(store_keys[i])
+                    else:
+                        data = encoded[i] if i in encoded else cache[file_keys[i]]
+                    # Images are already compressed - store them as-is instead of deflating them again
+                    archive.writestr(f"slide_{i+1:02d}.{extension}", data, compress_type=zipfile.ZIP_STORED)
+            for filename, data in post_copy_files(st.session_state.suggestions or {}):
+                archive.writestr(filename, data, compress_type=zipfile.ZIP_DEFLATED)
+        archive_file.seek(0)
+        zip_data = archive_file.read()
+
+    if encoder.encode_stats:
+        st.session_state.analytics.track_stage_timings(encoder.stage_timings)
+        st.session_state.analytics.track_export_encoding(export_format, encoder.encode_stats)
+    return zip_data
+
 # Initialize session state
 if 'slides' not in st.session_state:
     st.session_state.slides = []
@@ -1622,8 +1420,23 @@ if 'theme' not in st.session_state:
         brand_handle="elite.systemsai",
         show_verified_badge=True
     )
-if 'generated_images' not in st.session_state:
-    st.session_state.generated_images = []
+if 'suggestions' not in st.session_state:
+    st.session_state.suggestions = None  # Last AI suggestions, for the caption and hashtags
+if 'image_store' not in st.session_state:
+    # Previews and full-size export renders as PNG bytes within a per-session memory budget
+    st.session_state.image_store = EncodedImageStore()
+if 'generated_fingerprints' not in st.session_state:
+    st.session_state.generated_fingerprints = []  # Store keys of the previewed slides, in order
+if 'preview_request' not in st.session_state:
+    st.session_state.preview_request = None  # Theme, slides and sizes behind the current preview
+if 'export_bytes' not in st.session_state:
+    st.session_state.export_bytes = {}  # Encoded download files keyed by fingerprint and format
+if 'project_save' not in st.session_state:
+    st.session_state.project_save = None  # Background Save to Project job and whether it was tracked
+if 'pdf_exports' not in st.session_state:
+    st.session_state.pdf_exports = {}  # Background PDF export (job, cached, tracked) keyed by carousel fingerprints and page format
+if 'preview_slide_index' not in st.session_state:
+    st.session_state.preview_slide_index = 0  # Slide shown in the navigator, rendered first on preview
 if 'show_download_buttons' not in st.session_state:
     st.session_state.show_download_buttons = False
 
@@ -1653,6 +1466,12 @@ with st.sidebar:
     show_verified = st.checkbox("✓ Show Verified Badge", value=default_verified,
                                 help="Display blue checkmark next to brand handle")
 
+    show_watermark = st.checkbox("Show Watermark", value=getattr(st.session_state.theme, 'show_watermark', False),
+                                 help="Add a subtle @brand watermark to the bottom corner")
+    show_slide_indicator = st.checkbox("Show Slide Indicator",
+                                       value=getattr(st.session_state.theme, 'show_slide_indicator', False),
+                                       help="Add progress dots at the bottom of each slide")
+
     col1, col2 = st.columns(2)
     with col1:
         primary_color = st.color_picker("Primary Color", value=st.session_state.theme.primary_color)
@@ -1669,6 +1488,14 @@ with st.sidebar:
         index=0
     )
 
+    default_direction = getattr(st.session_state.theme, 'gradient_direction', 'vertical')
+    gradient_direction = st.selectbox(
+        "Gradient Style",
+        list(GRADIENT_DIRECTIONS),
+        index=GRADIENT_DIRECTIONS.index(default_direction),
+        help="Direction used for gradient slide backgrounds"
+    )
+
     # Font Size Controls
     st.subheader("📝 Typography")
     title_size = st.slider("Title Font Size", min_value=40, max_value=100, value=68, step=4)
@@ -1676,6 +1503,12 @@ with st.sidebar:
     body_size = st.slider("Body Font Size", min_value=24, max_value=60, value=36, step=2)
     bullet_size = st.slider("Bullet Font Size", min_value=20, max_value=50, value=32, step=2)
 
+    draft_preview = st.checkbox("Draft Preview", value=True,
+                                help="Render previews at reduced resolution. Downloads, project saves "
+                                     "and PDFs always render at full 1080x1080.")
+    draft_scale = st.select_slider("Draft Scale", options=[0.25, 0.5, 0.75], value=CarouselGenerator.DRAFT_SCALE,
+                                   format_func=lambda scale: f"{scale:.0%}", disabled=not draft_preview)
+
     # Update theme with all options
     st.session_state.theme = BrandTheme(
         name=brand_name,
@@ -1686,7 +1519,10 @@ with st.sidebar:
         text_color=text_color,
         font_family=font_family,
         brand_handle=brand_handle,
-        show_verified_badge=show_verified
+        show_verified_badge=show_verified,
+        gradient_direction=gradient_direction,
+        show_watermark=show_watermark,
+        show_slide_indicator=show_slide_indicator
     )
     
     st.divider()
@@ -1704,7 +1540,8 @@ with st.sidebar:
                     "accent_color": st.session_state.theme.accent_color,
                     "background_color": st.session_state.theme.background_color,
                     "text_color": st.session_state.theme.text_color,
-                    "font_family": st.session_state.theme.font_family
+                    "font_family": st.session_state.theme.font_family,
+                    "gradient_direction": st.session_state.theme.gradient_direction
                 }, f, indent=2)
             st.success("✅ Theme saved successfully!")
         except Exception as e:
@@ -1787,6 +1624,9 @@ with st.sidebar:
         # Preserve current brand handle when applying template
         current_handle = getattr(st.session_state.theme, 'brand_handle', 'elite.systemsai')
         current_verified = getattr(st.session_state.theme, 'show_verified_badge', True)
+        current_direction = getattr(st.session_state.theme, 'gradient_direction', 'vertical')
+        current_watermark = getattr(st.session_state.theme, 'show_watermark', False)
+        current_indicator = getattr(st.session_state.theme, 'show_slide_indicator', False)
         st.session_state.theme = BrandTheme(
             name=selected_template,
             primary_color=template["primary"],
@@ -1796,7 +1636,10 @@ with st.sidebar:
             text_color=template["text"],
             font_family="Arial",
             brand_handle=current_handle,
-            show_verified_badge=current_verified
+            show_verified_badge=current_verified,
+            gradient_direction=current_direction,
+            show_watermark=current_watermark,
+            show_slide_indicator=current_indicator
         )
         st.success(f"✅ Applied '{selected_template}' template!")
         st.rerun()
@@ -1866,7 +1709,51 @@ with st.sidebar:
             st.metric("Memory", f"{memory.percent:.1f}%")
         with col2:
             st.metric("Available RAM", f"{memory.available / (1024**3):.1f} GB")
-            st.metric("Font Cache", f"{len(CarouselGenerator._font_cache)} fonts")
+            font_stats = font_registry.stats()
+            fallback_stats = font_fallback.stats()
+            st.metric("Font Cache", f"{font_stats['fonts']} fonts",
+                      help=f"{font_stats['hits']} hits / {font_stats['misses']} misses "
+                           f"({font_stats['hit_rate']:.0%} hit rate), "
+                           f"{fallback_stats['fallback_fonts']} fallback fonts for emoji and symbols")
+
+        block_stats = CarouselGenerator._text_block_cache.stats()
+        st.metric("Text Block Cache", f"{block_stats['hit_rate']:.0%} hits",
+                  help=f"{block_stats['blocks']} blocks, {block_stats['bytes_used'] / (1024**2):.1f} MB "
+                       f"({block_stats['hits']} hits / {block_stats['misses']} misses)")
+
+        cache_stats = render_cache.stats()
+        st.metric("Render Cache", f"{cache_stats['hit_rate']:.0%} hits",
+                  help=f"{cache_stats['hits']} hits / {cache_stats['misses']} misses, "
+                       f"{cache_stats['bytes_saved'] / (1024**2):.1f} MB served instead of rendered, "
+                       f"{cache_stats['disk_bytes'] / (1024**2):.1f} of {cache_stats['max_bytes'] / (1024**2):.0f} MB "
+                       f"on disk")
+
+        store_stats = st.session_state.image_store.stats()
+        st.metric("Session Images", f"{store_stats['bytes_used'] / (1024**2):.1f} / "
+                                    f"{store_stats['max_bytes'] / (1024**2):.0f} MB",
+                  help=f"{store_stats['images']} slides stored as PNG, {store_stats['decoded']} decoded "
+                       f"({store_stats['decoded_bytes'] / (1024**2):.1f} MB), "
+                       f"{store_stats['evictions']} evicted to stay within the session budget")
+
+        # Admin view of the memo every session in this process shares
+        shared_memo = get_render_memo()
+        with st.expander("🧠 Shared Render Memo", expanded=False):
+            memo_stats = shared_memo.stats()
+            st.metric("Memo Size", f"{memo_stats['bytes_used'] / (1024**2):.1f} / "
+                                   f"{memo_stats['max_bytes'] / (1024**2):.0f} MB",
+                      help=f"{memo_stats['entries']} entries shared by every session, least recently used "
+                           f"evicted first")
+            st.metric("Memo Hit Rate", f"{memo_stats['hit_rate']:.0%}",
+                      help=f"{memo_stats['hits']} hits / {memo_stats['misses']} misses")
+            for namespace, namespace_stats in sorted(memo_stats['namespaces'].items()):
+                st.write(f"• {namespace}: {namespace_stats['entries']} entries, "
+                         f"{namespace_stats['bytes'] / (1024**2):.1f} MB, {namespace_stats['hit_rate']:.0%} hits, "
+                         f"{namespace_stats['evictions']} evicted")
+            st.write(f"• fonts: {font_stats['fonts']} loaded, {font_stats['hit_rate']:.0%} hits")
+            if st.button("🧹 Clear Shared Memo", key="clear_render_memo", use_container_width=True):
+                shared_memo.clear()
+                logger.info("Shared render memo cleared from the admin view")
+                st.rerun()
     except Exception:
         st.info("Performance metrics unavailable")
     
@@ -1876,6 +1763,14 @@ with st.sidebar:
         
         st.metric("Session Duration", f"{summary['session_duration_minutes']:.1f} min")
         st.metric("Total Events", summary['total_events'])
+        if summary['last_time_to_first_slide'] is not None:
+            st.metric("Time to First Slide", f"{summary['last_time_to_first_slide'] * 1000:.0f} ms",
+                      help="How long the last preview took to show the selected slide")
+        
+        if summary['stage_breakdown']:
+            st.write("**Render Stage Breakdown:**")
+            for entry in summary['stage_breakdown']:
+                st.write(f"• {entry['stage']}: {entry['avg_ms']:.1f} ms/slide ({entry['share']:.0%})")
         
         if summary['event_breakdown']:
             st.write("**Activity Breakdown:**")
@@ -1927,37 +1822,8 @@ with tab1:
                     if suggestions:
                         # Create slides from AI suggestions
                         status_container.info("🎨 Creating carousel slides...")
-                        st.session_state.slides = []
-                        
-                        # Hook slide
-                        st.session_state.slides.append(CarouselSlide(
-                            slide_number=1,
-                            title=suggestions['hook_slide']['title'],
-                            subtitle=suggestions['hook_slide'].get('subtitle', ''),
-                            layout="center",
-                            background_style="gradient"
-                        ))
-                        
-                        # Content slides
-                        for i, slide_data in enumerate(suggestions['content_slides'], start=2):
-                            st.session_state.slides.append(CarouselSlide(
-                                slide_number=i,
-                                title=slide_data.get('title', f'Slide {i}'),
-                                subtitle=slide_data.get('subtitle', ''),
-                                bullet_points=slide_data.get('bullet_points', []),
-                                layout="left",
-                                background_style="gradient"
-                            ))
-                        
-                        # CTA slide
-                        st.session_state.slides.append(CarouselSlide(
-                            slide_number=num_slides,
-                            title=suggestions['cta_slide']['title'],
-                            subtitle=suggestions['cta_slide'].get('subtitle', ''),
-                            body_text=suggestions['cta_slide'].get('action_text', ''),
-                            layout="center",
-                            background_style="gradient"
-                        ))
+                        st.session_state.slides = slides_from_suggestions(suggestions)
+                        st.session_state.suggestions = suggestions
                         
                         status_container.success("✅ Content generated! Check the Preview tab")
                         
@@ -2006,8 +1872,17 @@ with tab2:
         with col2:
             current_slide.layout = st.selectbox("Layout", ["center", "left", "right"], 
                                                index=["center", "left", "right"].index(current_slide.layout))
-            current_slide.background_style = st.selectbox("Background", ["gradient", "solid"],
-                                                         index=["gradient", "solid"].index(current_slide.background_style))
+            background_styles = ["gradient", "solid", "image"]
+            current_slide.background_style = st.selectbox("Background", background_styles,
+                                                         index=background_styles.index(current_slide.background_style))
+            if current_slide.background_style == "image":
+                background_photo = st.file_uploader("Background Photo", type=["jpg", "jpeg", "png", "webp"],
+                                                    key=f"background_photo_{slide_to_edit}",
+                                                    help="Cropped to fill the slide and darkened for readable text")
+                if background_photo is not None:
+                    current_slide.image_path = save_uploaded_photo(background_photo)
+                if not current_slide.image_path:
+                    st.caption("Upload a photo - the slide stays black until then")
             
             # Bullet points editor
             st.write("Bullet Points")
@@ -2075,8 +1950,8 @@ with tab3:
         # Generate preview
         if st.button("🎨 Generate Preview", type="primary", use_container_width=True):
             try:
-                generator = CarouselGenerator(st.session_state.theme)
-                st.session_state.generated_images = []
+                preview_scale = draft_scale if draft_preview else 1.0
+                generator = CarouselGenerator(st.session_state.theme, scale=preview_scale, memo=get_render_memo())
                 
                 # Get custom font sizes from sidebar
                 custom_sizes = {
@@ -2086,40 +1961,117 @@ with tab3:
                     'bullet': bullet_size
                 }
                 
+                # Previously rendered slides, keyed by the inputs they were rendered from
+                image_store = st.session_state.image_store
+                slides = st.session_state.slides
+                fingerprints = [slide_fingerprint(st.session_state.theme, slide, custom_sizes, preview_scale)
+                                for slide in slides]
+                stale_indices = [i for i, fingerprint in enumerate(fingerprints)
+                                 if fingerprint not in image_store]
+                # This preview's slides replace the previous pins before anything new is stored
+                image_store.pin(fingerprints)
+                # Slides rendered before by any session or process come from the shared memo or render cache
+                changed_slides = len(stale_indices)
+                stale_indices = load_cached_renders(fingerprints, stale_indices)
+                cached_slides = changed_slides - len(stale_indices)
+                reused_slides = len(slides) - len(stale_indices)
+                
                 progress_bar = st.progress(0)
                 status_text = st.empty()
                 
-                logger.info(f"Starting generation of {len(st.session_state.slides)} slides")
+                logger.info(f"Starting generation of {len(slides)} slides ({reused_slides} unchanged)")
+                
+                # The slide selected in the navigator is shown first, the rest follow in navigation order
+                selected_index = min(st.session_state.preview_slide_index, len(slides) - 1)
+                progressive_preview = st.empty()
                 
                 generation_start = time.time()
-                successful_slides = 0
                 
-                for i, slide in enumerate(st.session_state.slides):
-                    status_text.text(f"Generating slide {i + 1} of {len(st.session_state.slides)}: {slide.title[:30]}...")
-                    
-                    try:
-                        img = generator.create_slide(slide, custom_sizes)
-                        st.session_state.generated_images.append(img)
-                        successful_slides += 1
-                        progress_bar.progress((i + 1) / len(st.session_state.slides))
-                        
-                    except Exception as slide_error:
-                        logger.error(f"Failed to generate slide {i + 1}: {str(slide_error)}")
-                        status_text.error(f"Failed to generate slide {i + 1}: {str(slide_error)}")
-                        continue
+                rendered = {}
+                if selected_index in stale_indices:
+                    rendered[selected_index] = generator.create_slide(slides[selected_index], custom_sizes)
+                    first_image = rendered[selected_index]
+                else:
+                    first_image = image_store.get_bytes(fingerprints[selected_index])
+                time_to_first_slide = time.time() - generation_start
+                
+                with progressive_preview.container():
+                    col1, col2, col3 = st.columns([1, 2, 1])
+                    with col2:
+                        st.image(first_image, caption=f"Slide {selected_index + 1} - rendering the remaining slides...",
+                                 use_container_width=True)
+                    # A strip of every slide, filled in as each one is ready
+                    thumbnails = [column.empty() for column in st.columns(len(slides))]
+                
+                def show_thumbnail(index: int, image):
+                    if not isinstance(image, bytes):
+                        # Thumbnails only need a fraction of the pixels
+                        image = image.reduce(max(1, image.width // 180))
+                    thumbnails[index].image(image, caption=str(index + 1), use_container_width=True)
+                
+                show_thumbnail(selected_index, first_image)
+                for i in range(len(slides)):
+                    if i not in stale_indices and i != selected_index:
+                        show_thumbnail(i, image_store.get_bytes(fingerprints[i]))
+                
+                # Then the slides after the selected one, wrapping around to the first
+                navigation_order = [(selected_index + offset) % len(slides) for offset in range(1, len(slides))]
+                remaining_indices = [i for i in navigation_order if i in stale_indices]
+                first_rendered = len(rendered)
+                
+                def update_progress(completed: int, total: int, index: int, image):
+                    done = reused_slides + first_rendered + completed
+                    show_thumbnail(remaining_indices[index], image)
+                    status_text.text(f"Generated slide {remaining_indices[index] + 1} "
+                                     f"({first_rendered + completed} of {len(stale_indices)} changed slides)")
+                    progress_bar.progress(done / len(slides),
+                                          text=f"{reused_slides} reused, {first_rendered + completed} re-rendered")
+                
+                # Render the other changed slides, in parallel and started in navigation order;
+                # failures come back as error slides
+                rendered_images = generator.render_carousel(
+                    [slides[i] for i in remaining_indices], custom_sizes,
+                    progress_callback=update_progress
+                )
+                rendered.update(zip(remaining_indices, rendered_images))
+                progressive_preview.empty()
+                
+                store_keys = store_renders(generator, slides, fingerprints, rendered)
+                st.session_state.generated_fingerprints = store_keys
+                # Exports render this exact carousel at full resolution, even after further edits
+                st.session_state.preview_request = {
+                    'theme': copy.deepcopy(st.session_state.theme),
+                    'slides': copy.deepcopy(slides),
+                    'custom_sizes': custom_sizes
+                }
+                successful_slides = len(slides) - len(generator.failed_slides)
+                progress_bar.progress(1.0, text=f"{reused_slides} reused, {len(stale_indices)} re-rendered")
                 
                 generation_time = time.time() - generation_start
-                generation_success = successful_slides == len(st.session_state.slides)
+                generation_success = successful_slides == len(slides)
                 
-                # Track generation performance
+                # Track generation performance - after rendering, as each event samples system load
+                st.session_state.analytics.track_time_to_first_slide(
+                    time_to_first_slide, selected_index + 1, reused=selected_index not in stale_indices
+                )
                 st.session_state.analytics.track_generation_performance(
                     len(st.session_state.slides), 
                     generation_time, 
-                    generation_success
+                    generation_success,
+                    reused_slides=reused_slides,
+                    cached_slides=cached_slides
                 )
+                st.session_state.analytics.track_layout_performance(generator.layout_stats)
+                st.session_state.analytics.track_stage_timings(generator.stage_timings)
                 
-                status_text.success("✅ Preview generated successfully!")
-                logger.info(f"Successfully generated {successful_slides}/{len(st.session_state.slides)} slides in {generation_time:.2f}s")
+                status_text.success(f"✅ Preview generated successfully! "
+                                    f"({reused_slides} reused, {len(stale_indices)} re-rendered"
+                                    f"{f', {cached_slides} from shared caches' if cached_slides else ''})")
+                if generator.failed_slides:
+                    st.warning(f"⚠️ Slides {', '.join(map(str, sorted(generator.failed_slides)))} failed to render - "
+                               f"Generate Preview again to retry them")
+                logger.info(f"Successfully generated {successful_slides}/{len(st.session_state.slides)} slides "
+                            f"({reused_slides} reused) in {generation_time:.2f}s")
                 
             except Exception as e:
                 logger.error(f"Preview generation failed: {str(e)}")
@@ -2127,96 +2079,149 @@ with tab3:
                 st.error("Please check the logs for detailed error information.")
         
         # Display preview
-        if st.session_state.generated_images:
+        if st.session_state.generated_fingerprints:
             st.subheader("📱 Carousel Preview")
             
             # Slider for navigation
             current_slide = st.select_slider(
                 "Navigate Slides",
-                options=range(len(st.session_state.generated_images)),
+                options=range(len(st.session_state.generated_fingerprints)),
                 format_func=lambda x: f"Slide {x+1}"
             )
+            # Remembered so the next preview renders this slide first
+            st.session_state.preview_slide_index = current_slide
             
             # Display current slide
             col1, col2, col3 = st.columns([1, 2, 1])
             with col2:
-                st.image(st.session_state.generated_images[current_slide],
-                        caption=f"Slide {current_slide + 1} of {len(st.session_state.generated_images)}",
+                # The stored PNG goes to the browser as-is, without decoding the slide
+                preview_key = st.session_state.generated_fingerprints[current_slide]
+                is_draft = st.session_state.image_store.size(preview_key)[0] < CarouselGenerator.INSTAGRAM_SIZE[0]
+                st.image(st.session_state.image_store.get_bytes(preview_key),
+                        caption=f"Slide {current_slide + 1} of {len(st.session_state.generated_fingerprints)}"
+                                f"{' (draft)' if is_draft else ''}",
                         use_container_width=True)
             
             # Export options
             st.divider()
             st.subheader("💾 Export Options")
             
-            col1, col2, col3 = st.columns(3)
+            format_col, level_col, pdf_col = st.columns(3)
+            with format_col:
+                export_format = st.selectbox("Image Format", list(EXPORT_FORMATS),
+                                             help="Format of the individual image downloads")
+            with level_col:
+                compress_level = st.slider("PNG Compression", 0, 9, DEFAULT_PNG_COMPRESS_LEVEL,
+                                           disabled=export_format != "PNG",
+                                           help="Higher levels make smaller files but take longer to encode")
+            with pdf_col:
+                pdf_pages = st.selectbox("PDF Pages", PDF_PAGE_FORMATS,
+                                         help="JPEG pages make smaller PDFs, lossless pages keep every pixel")
+            
+            col1, col2, col3, col4 = st.columns(4)
             
             with col1:
+                # Whole carousel in one archive - only built when asked for, not on every rerun
+                if st.button("📦 Download ZIP", use_container_width=True):
+                    st.session_state.analytics.track_export("zip", len(st.session_state.generated_fingerprints))
+                    zip_data = build_carousel_zip(export_format, compress_level)
+                    
+                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    st.download_button(
+                        label="Download ZIP",
+                        data=zip_data,
+                        file_name=f"carousel_{timestamp}.zip",
+                        mime="application/zip"
+                    )
+                
                 # Download individual images - toggle to show/hide
                 button_label = "📥 Hide Downloads" if st.session_state.show_download_buttons else "📥 Download All Images"
                 if st.button(button_label, use_container_width=True, key="toggle_downloads"):
                     st.session_state.show_download_buttons = not st.session_state.show_download_buttons
                     if st.session_state.show_download_buttons:
-                        st.session_state.analytics.track_export("individual_images", len(st.session_state.generated_images))
+                        st.session_state.analytics.track_export("individual_images", len(st.session_state.generated_fingerprints))
                     st.rerun()
 
-                # Always show download buttons if expanded
+                # Always show download buttons if expanded - encoded once, reused on every rerun
                 if st.session_state.show_download_buttons:
-                    for i, img in enumerate(st.session_state.generated_images):
-                        buffer = io.BytesIO()
-                        img.save(buffer, format='PNG', quality=100)
-                        buffer.seek(0)
-
-                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        filename = f"carousel_{timestamp}_slide_{i+1}.png"
+                    _, _, extension, mime = EXPORT_FORMATS[export_format]
+                    export_files = get_export_bytes(export_format, compress_level)
+                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    for i, data in enumerate(export_files):
+                        filename = f"carousel_{timestamp}_slide_{i+1}.{extension}"
 
                         st.download_button(
                             label=f"⬇️ Slide {i+1}",
-                            data=buffer,
+                            data=data,
                             file_name=filename,
-                            mime="image/png",
+                            mime=mime,
                             key=f"download_{i}"
                         )
+                    st.caption(f"{export_format}: {sum(len(data) for data in export_files) / 1024:.0f} KB total")
             
             with col2:
-                # Save to project folder
+                # Save to project folder - encoded and written in the background, returns immediately
                 if st.button("💾 Save to Project", use_container_width=True):
-                    st.session_state.analytics.track_export("project_save", len(st.session_state.generated_images))
-                    output_dir = Path("carousel_output")
-                    output_dir.mkdir(exist_ok=True)
+                    st.session_state.analytics.track_export("project_save", len(st.session_state.generated_fingerprints))
+                    job_args = export_job_args()
                     
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    
-                    for i, img in enumerate(st.session_state.generated_images):
-                        filename = output_dir / f"carousel_{timestamp}_slide_{i+1}.png"
-                        img.save(filename, quality=100)
-                    
-                    st.success(f"✅ Saved {len(st.session_state.generated_images)} images to carousel_output/")
+                    metadata = {'theme': st.session_state.preview_request['theme'].name}
+                    if st.session_state.suggestions:
+                        metadata.update({key: st.session_state.suggestions[key] for key in ('caption', 'hashtags')
+                                         if key in st.session_state.suggestions})
+                    # Missing full-resolution slides are rendered on the worker thread too
+                    st.session_state.project_save = {
+                        'job': run_in_background(lambda: save_carousel("carousel_output", f"carousel_{timestamp}",
+                                                                       render_export_pages(*job_args)[0], metadata)),
+                        'tracked': False
+                    }
+                
+                if st.session_state.project_save:
+                    show_project_save_status()
             
             with col3:
-                # Generate PDF
+                # Render and build the PDF on a worker thread, cached per carousel and page format
+                pdf_key = (tuple(get_export_fingerprints()), pdf_pages)
                 if st.button("📄 Export as PDF", use_container_width=True):
-                    if st.session_state.generated_images:
-                        st.session_state.analytics.track_export("pdf", len(st.session_state.generated_images))
-                        pdf_buffer = io.BytesIO()
-                        st.session_state.generated_images[0].save(
-                            pdf_buffer,
-                            "PDF",
-                            save_all=True,
-                            append_images=st.session_state.generated_images[1:]
-                        )
-                        pdf_buffer.seek(0)
-                        
-                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        st.download_button(
-                            label="Download PDF",
-                            data=pdf_buffer,
-                            file_name=f"carousel_{timestamp}.pdf",
-                            mime="application/pdf"
-                        )
+                    st.session_state.analytics.track_export("pdf", len(st.session_state.generated_fingerprints))
+                    pdf_export = st.session_state.pdf_exports.get(pdf_key)
+                    if pdf_export is None:
+                        job_args = export_job_args()
+                        job = run_in_background(build_pdf_export, job_args, pdf_pages)
+                        # Only the current carousel's PDF is kept
+                        st.session_state.pdf_exports = {pdf_key: {'job': job, 'cached': False, 'tracked': False}}
+                    elif pdf_export['job'].done():
+                        pdf_export.update(cached=True, tracked=False)
+                
+                if pdf_key in st.session_state.pdf_exports:
+                    show_pdf_export_status(pdf_key, pdf_pages)
+            
+            with col4:
+                # Vector slides come straight from the layout pass - no rasterizing
+                if st.button("🖋️ Export as SVG", use_container_width=True):
+                    request = st.session_state.preview_request
+                    st.session_state.analytics.track_export("svg", len(request['slides']))
+                    svg_generator = CarouselGenerator(request['theme'], memo=get_render_memo())
+                    
+                    svg_buffer = io.BytesIO()
+                    with zipfile.ZipFile(svg_buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+                        for i, slide in enumerate(request['slides']):
+                            archive.writestr(f"slide_{i+1}.svg",
+                                             svg_generator.create_svg_slide(slide, request['custom_sizes']))
+                    svg_buffer.seek(0)
+                    
+                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    st.download_button(
+                        label="Download SVG (.zip)",
+                        data=svg_buffer,
+                        file_name=f"carousel_{timestamp}_svg.zip",
+                        mime="application/zip"
+                    )
             
             # Quick share info
             st.info("💡 **Pro Tips:**\n"
-                   "- Images are optimized for Instagram (1080x1080)\n"
+                   "- Images are optimized for Instagram (1080x1080) - draft previews are exported at full size\n"
                    "- Upload in order from Slide 1 to last\n"
                    "- Use consistent hashtags across carousel posts\n"
                    "- Post at peak engagement times for your audience")
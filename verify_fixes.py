@@ -98,7 +98,8 @@ def verify_analytics():
 
 def verify_font_caching():
     """Verify font caching is implemented"""
-    with open('carousel_generator.py', 'r') as f:
+    # The rendering engine (and its font registry) lives in carousel_engine.py
+    with open('carousel_engine.py', 'r') as f:
         code = f.read()
     
     if '_font_cache' not in code:
@@ -131,6 +132,56 @@ def verify_dependencies():
         print("✅ Dependencies validation: PASSED")
         return True
 
+def verify_image_store():
+    """Verify the session image store evicts least recently used slides but never pinned ones"""
+    from PIL import Image
+    from carousel_engine import EncodedImageStore
+
+    # Noise barely compresses, so each slide takes roughly the same number of PNG bytes
+    slides = {f"slide_{i}": Image.effect_noise((200, 200), 64).convert('RGB') for i in range(10)}
+    store = EncodedImageStore()
+    store.put("probe", slides["slide_0"])
+    slide_bytes = len(store.get_bytes("probe"))
+    issues = []
+
+    # Room for four slides: the oldest ones go first
+    store = EncodedImageStore(max_bytes=slide_bytes * 4 + slide_bytes // 2)
+    for key, img in slides.items():
+        store.put(key, img)
+    if sorted(store._encoded) != ["slide_6", "slide_7", "slide_8", "slide_9"]:
+        issues.append(f"LRU eviction kept {sorted(store._encoded)}")
+    if store.bytes_used > store.max_bytes:
+        issues.append("unpinned slides exceed the budget")
+
+    # Previews pinned, then an export pins its own keys before storing more than the budget holds
+    preview = ["slide_8", "slide_9"]
+    export = [f"export_{i}" for i in range(6)]
+    store.pin(preview + export)
+    for key, img in zip(export, slides.values()):
+        store.put(key, img)
+    missing = [key for key in preview + export if key not in store]
+    if missing:
+        issues.append(f"pinned slides evicted: {missing}")
+    try:
+        for key in preview + export:
+            store.get_bytes(key)
+            store.get(key)
+    except KeyError as e:
+        issues.append(f"pinned slide not readable: {e}")
+
+    # Once unpinned they are evictable again
+    store.pin([])
+    store.put("after", slides["slide_0"])
+    if store.bytes_used > store.max_bytes:
+        issues.append("budget not restored after unpinning")
+
+    if issues:
+        print(f"❌ Image store issues: {issues}")
+        return False
+    else:
+        print("✅ Image store eviction and pinning: PASSED")
+        return True
+
 def main():
     """Run all verification checks"""
     print("🚀 Elite Systems AI - Deployment Verification")
@@ -142,7 +193,8 @@ def main():
         verify_error_handling,
         verify_analytics,
         verify_font_caching,
-        verify_dependencies
+        verify_dependencies,
+        verify_image_store
     ]
     
     passed = 0